@@ -6,8 +6,13 @@ class Node:
     - name: The identifier or name of the node.
     - path: The path leading to the node (default is None).
     - cost: The cost associated with reaching the node (default is None).
+
+    Instances have no __dict__; the search engines themselves run over preallocated arrays
+    and do not allocate nodes at all.
     """
 
+    __slots__ = ("name", "path", "cost")
+
     def __init__(self, name, path=None, cost=None):
         """
         Initializes a new instance of the Node class.
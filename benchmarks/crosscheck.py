@@ -0,0 +1,279 @@
+"""
+Cross-checks the solvers against each other on small seeded random mazes.
+
+Every solver runs between random road cells of every maze kind, and its path must be a valid
+path whose reported cost is its weighted cost (search.path_cost). Dijkstra is the reference:
+A* must match its cost, and BFS, JPS, the distance field and PathQueries the fewest moves of
+BFS. 8-connected JPS is checked against an 8-connected Dijkstra.
+
+The incremental structures are checked against fresh ones after random wall toggles: LPA*
+replans against Dijkstra, ComponentIndex against a new index, and HPA* update() and load()
+of a file saved before the edits against a new abstraction. Any mismatch is printed and the
+run exits with status 1.
+
+Usage: python -m benchmarks.crosscheck [--size 48] [--kinds perfect,rooms,obstacles,no-path,terrain]
+                                       [--rounds 10] [--edits 20] [--cluster 8] [--seed 0]
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+import tempfile
+from connectivity import ComponentIndex
+from generator import GENERATORS, generate
+from grid import ROAD, WALL, Grid
+from hpa import HPAStar
+from lpa_star import LPAStar
+from queries import PathQueries
+from search import BFS, DFS, a_star, dijkstra, jump_point_search, path_cost
+#==============================================
+
+def copy_grid(grid):
+    """
+    :return: a Grid with a copy of the cells of the given one, to be edited without touching it
+    """
+    return Grid(grid.rows, grid.cols, bytearray(grid.cells), grid.start, grid.goal)
+
+def random_roads(grid, rng, count):
+    """
+    :return: list of count random road cells
+    """
+    cells = []
+    while len(cells) < count:
+        cell = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        if not grid.is_wall(cell):
+            cells.append(cell)
+    return cells
+
+def toggle(grid, cell):
+    """
+    Turns a block into a road or a road (of any weight) into a block.
+    """
+    grid.set_cell(cell, ROAD if grid.is_wall(cell) else WALL)
+
+def path_problem(grid, path, start, goal, diagonal=False):
+    """
+    :return: why the path is not a path of the grid from start to goal, None if it is one
+    """
+    if path[0] != start or path[-1] != goal:
+        return "runs from %s to %s" % (path[0], path[-1])
+    for a, b in zip(path, path[1:]):
+        if grid.is_wall(b):
+            return "enters the block %s" % (b,)
+        rows, cols = abs(a[0] - b[0]), abs(a[1] - b[1])
+        if rows + cols != 1 and not (diagonal and rows == cols == 1):
+            return "jumps from %s to %s" % (a, b)
+    return None
+
+def diagonal_dijkstra(grid, start, goal):
+    """
+    Reference for 8-connected JPS: Dijkstra with diagonal moves costing sqrt(2), which may
+    only pass between two roads (no corner cutting). Terrain weights count as plain roads.
+    :return: the cost of the cheapest path, None if there is none
+    """
+    moves = [(step, 1.0) for step in ((0, 1), (-1, 0), (1, 0), (0, -1))]
+    moves += [(step, math.sqrt(2)) for step in ((-1, -1), (-1, 1), (1, -1), (1, 1))]
+    distances = {start: 0.0}
+    queue = [(0.0, start)]
+    while queue:
+        distance, (row, col) = heapq.heappop(queue)
+        if (row, col) == goal:
+            return distance
+        if distance > distances[row, col]:
+            continue
+        for (d_row, d_col), cost in moves:
+            node = (row + d_row, col + d_col)
+            if not (0 <= node[0] < grid.rows and 0 <= node[1] < grid.cols) or grid.is_wall(node):
+                continue
+            if d_row and d_col and (grid.is_wall((row + d_row, col)) or grid.is_wall((row, col + d_col))):
+                continue
+            if distance + cost < distances.get(node, math.inf):
+                distances[node] = distance + cost
+                heapq.heappush(queue, (distance + cost, node))
+    return None
+
+def check_solvers(grid, rng, pairs, cluster_size):
+    """
+    Runs every solver between random pairs of road cells.
+    :return: list of mismatch descriptions
+    """
+    try:
+        from distance_field import flood_fill
+    except ImportError:
+        flood_fill = None  # NumPy is not installed
+    hpa, queries = HPAStar(grid, cluster_size), PathQueries(grid)
+    solvers = {"bfs": BFS, "dfs": DFS, "astar": a_star, "jps": jump_point_search,
+               "hpa": lambda grid, start, goal: hpa.query(start, goal),
+               "queries": lambda grid, start, goal: queries.query(start, goal)}
+    if flood_fill is not None:
+        solvers["flood"] = flood_fill
+
+    pairs = [tuple(random_roads(grid, rng, 2)) for _ in range(pairs)]
+    if not grid.is_wall(grid.start) and not grid.is_wall(grid.goal):
+        pairs.insert(0, (grid.start, grid.goal))
+
+    problems = []
+    for start, goal in pairs:
+        case = "%s -> %s" % (start, goal)
+        best_path, best_cost = dijkstra(grid, start, goal)
+        bfs_path = BFS(grid, start, goal)[0]
+        if best_path is not None:
+            problem = path_problem(grid, best_path, start, goal)
+            if problem or best_cost != path_cost(grid, best_path):
+                problems.append("dijkstra %s: %s" % (case, problem or "cost %s" % best_cost))
+
+        for name, solver in solvers.items():
+            path, cost = solver(grid, start, goal)
+            if (path is None) != (best_path is None):
+                problems.append("%s %s: %s a path" % (name, case, "missed" if path is None else "found"))
+                continue
+            if path is None:
+                continue
+            problem = path_problem(grid, path, start, goal)
+            if problem is None and cost != path_cost(grid, path):
+                problem = "cost %s, but the path costs %s" % (cost, path_cost(grid, path))
+            if problem is None and name == "astar" and cost != best_cost:
+                problem = "cost %s, dijkstra %s" % (cost, best_cost)
+            if problem is None and name in ("bfs", "jps", "flood", "queries") and len(path) != len(bfs_path):
+                problem = "%d moves, bfs %d" % (len(path) - 1, len(bfs_path) - 1)
+            if problem is None and name == "hpa" and len(path) < len(bfs_path):
+                problem = "%d moves, fewer than bfs %d" % (len(path) - 1, len(bfs_path) - 1)
+            if problem:
+                problems.append("%s %s: %s" % (name, case, problem))
+
+        path, cost = jump_point_search(grid, start, goal, diagonal=True)
+        expected = diagonal_dijkstra(grid, start, goal)
+        problem = None
+        if (path is None) != (expected is None):
+            problem = "missed a path" if path is None else "found a path"
+        elif path is not None:
+            problem = path_problem(grid, path, start, goal, diagonal=True)
+            if problem is None and abs(cost - expected) > 1e-9:
+                problem = "cost %s, 8-connected dijkstra %s" % (cost, expected)
+        if problem:
+            problems.append("jps diagonal %s: %s" % (case, problem))
+    return problems
+
+def check_lpa(grid, rng, edits):
+    """
+    Replans with LPA* after every random toggle and compares it with Dijkstra.
+    :return: list of mismatch descriptions
+    """
+    grid = copy_grid(grid)
+    start, goal = random_roads(grid, rng, 2)
+    if start == goal:
+        return []
+    planner = LPAStar(grid, start, goal)
+    problems = []
+    for edit in range(edits + 1):
+        if edit:
+            cell = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+            if cell in (start, goal):
+                continue
+            planner.toggle(cell)
+        path, cost = planner.plan()
+        expected = dijkstra(grid, start, goal)[1]
+        problem = path_problem(grid, path, start, goal) if path is not None else None
+        if problem is None and (cost != expected or path is not None and cost != path_cost(grid, path)):
+            problem = "cost %s, dijkstra %s" % (cost, expected)
+        if problem:
+            problems.append("lpa %s -> %s after %d edits: %s" % (start, goal, edit, problem))
+            break
+    return problems
+
+def partition(index):
+    """
+    :return: the components of a ComponentIndex, as a set of frozensets of flat indices
+    """
+    components = {}
+    for node, label in enumerate(index.labels):
+        if label:
+            components.setdefault(label, set()).add(node)
+    return {frozenset(nodes) for nodes in components.values()}
+
+def check_components(grid, rng, edits):
+    """
+    Updates a ComponentIndex after every random toggle and compares it with a fresh one.
+    :return: list of mismatch descriptions
+    """
+    grid = copy_grid(grid)
+    index = ComponentIndex(grid)
+    for edit in range(1, edits + 1):
+        cell = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        toggle(grid, cell)
+        index.update(cell)
+        components = partition(index)
+        if components != partition(ComponentIndex(grid)) \
+                or sorted(index.sizes.values()) != sorted(map(len, components)):
+            return ["components after %d edits (the last at %s) differ from a fresh index" % (edit, cell)]
+    return []
+
+def abstraction(hpa):
+    """
+    :return: the transitions, distances and links of an HPAStar, in a comparable form
+    """
+    borders = {key: pairs for key, pairs in hpa._borders.items() if pairs}
+    links = {node: sorted(others) for node, others in hpa._links.items()}
+    return borders, hpa._nodes, [distances.tolist() for distances in hpa._distances], links
+
+def check_hpa(grid, rng, edits, cluster_size, directory):
+    """
+    Edits a maze, then compares HPA* update() and load() of a file saved before the edits
+    with a fresh abstraction.
+    :return: list of mismatch descriptions
+    """
+    grid = copy_grid(grid)
+    hpa = HPAStar(grid, cluster_size)
+    file_path = os.path.join(directory, "crosscheck.hpa")
+    hpa.save(file_path)
+    cells = [(rng.randrange(grid.rows), rng.randrange(grid.cols)) for _ in range(edits)]
+    for cell in cells:
+        toggle(grid, cell)
+    hpa.update(cells)
+
+    expected = abstraction(HPAStar(grid, cluster_size))
+    problems = []
+    if abstraction(hpa) != expected:
+        problems.append("hpa update after %d edits differs from a fresh build" % edits)
+    if abstraction(HPAStar.load(file_path, grid)[0]) != expected:
+        problems.append("hpa load after %d edits differs from a fresh build" % edits)
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.crosscheck", description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=48, help="the maze size (default: 48)")
+    parser.add_argument("--kinds", default=",".join(GENERATORS), help="comma-separated maze kinds")
+    parser.add_argument("--rounds", type=int, default=10, help="seeded mazes per kind (default: 10)")
+    parser.add_argument("--edits", type=int, default=20, help="random toggles per incremental check (default: 20)")
+    parser.add_argument("--cluster", type=int, default=8, help="the HPA* cluster size (default: 8)")
+    parser.add_argument("--seed", type=int, default=0, help="the first maze seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    kinds = args.kinds.split(",")
+    for name in kinds:
+        if name not in GENERATORS:
+            parser.error("unknown maze kind: %s" % name)
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in kinds:
+            for seed in range(args.seed, args.seed + args.rounds):
+                grid = generate(kind, args.size, seed)
+                rng = random.Random(seed)
+                problems = (check_solvers(grid, rng, 5, args.cluster) + check_lpa(grid, rng, args.edits)
+                            + check_components(grid, rng, args.edits)
+                            + check_hpa(grid, rng, args.edits, args.cluster, directory))
+                for problem in problems:
+                    print("%s/%d seed %d: %s" % (kind, args.size, seed, problem), flush=True)
+                failures += len(problems)
+            print(f"{kind:<10} {args.rounds} mazes checked", flush=True)
+
+    if failures:
+        print("%d mismatch(es)" % failures)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Measures the HPA* abstraction on large generated mazes.
+
+For every maze kind, reports the time to build the abstraction, to save it and to load it
+back, then the time of seeded random queries, with and without refining the path into
+cells, and their optimality gap: how much longer their paths are than a_star's.
+
+Usage: python -m benchmarks.hpa [--size 2000] [--kinds perfect,rooms,obstacles]
+                                [--cluster 32] [--queries 10] [--seed 0] [--no-gap]
+
+--no-gap skips the a_star reference searches, which dominate the run time on the largest mazes.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from generator import GENERATORS, generate
+from hpa import HPAStar
+from search import a_star
+#==============================================
+
+def timed(function, *args, **kwargs):
+    """
+    Runs function(*args, **kwargs).
+    :return: a tuple of its result and the elapsed wall time in seconds
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def random_pairs(grid, count, seed):
+    """
+    :return: list of count (start, goal) pairs of random road cells
+    """
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        start = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        goal = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        if not grid.is_wall(start) and not grid.is_wall(goal):
+            pairs.append((start, goal))
+    return pairs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hpa", description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=2000, help="the maze size (default: 2000)")
+    parser.add_argument("--kinds", default="perfect,rooms,obstacles", help="comma-separated maze kinds")
+    parser.add_argument("--cluster", type=int, default=32, help="the cluster size (default: 32)")
+    parser.add_argument("--queries", type=int, default=10, help="random queries per maze (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="the maze and query seed (default: 0)")
+    parser.add_argument("--no-gap", action="store_true", help="skip the a_star searches measuring the gap")
+    args = parser.parse_args(argv)
+
+    kinds = args.kinds.split(",")
+    for name in kinds:
+        if name not in GENERATORS:
+            parser.error("unknown maze kind: %s" % name)
+
+    for kind in kinds:
+        grid = generate(kind, args.size, args.seed)
+        hpa, build = timed(HPAStar, grid, args.cluster)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "maze.hpa")
+            _, save = timed(hpa.save, file_path)
+            _, load = timed(HPAStar.load, file_path, grid)
+        print(f"{kind}/{args.size}: {hpa.cluster_rows * hpa.cluster_cols} clusters, {len(hpa._links)} transitions, "
+              f"build {build:.1f} s, save {save * 1000:.0f} ms, load {load * 1000:.0f} ms", flush=True)
+
+        abstract, refined, gaps = [], [], []
+        for start, goal in random_pairs(grid, args.queries, args.seed):
+            (_, cost), seconds = timed(hpa.query, start, goal, refine=False)
+            abstract.append(seconds)
+            (path, _), seconds = timed(hpa.query, start, goal)
+            refined.append(seconds)
+            if path is not None and not args.no_gap:
+                best = a_star(grid, start, goal)[1]
+                gaps.append((cost - best) / best if best else 0.0)
+
+        print(f"  query  {statistics.median(abstract) * 1000:8.1f} ms median {max(abstract) * 1000:8.1f} ms max"
+              f"  (cost only)")
+        print(f"  query  {statistics.median(refined) * 1000:8.1f} ms median {max(refined) * 1000:8.1f} ms max"
+              f"  (refined)")
+        if gaps:
+            print(f"  gap    {statistics.mean(gaps):8.2%} mean   {max(gaps):8.2%} max", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
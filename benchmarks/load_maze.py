@@ -0,0 +1,81 @@
+"""
+Measures maze load times.
+
+Times the maze_tests/*.xlsx fixtures with load_maze and with the previous cell-by-cell
+iloc reader, then synthetic CSV, text and .npy mazes of about 10M cells.
+
+Usage: python -m benchmarks.load_maze [cells]
+"""
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+from loaders import load_maze
+#==============================================
+
+def iloc_read_maze(file_path):
+    """
+    Reads an Excel maze one cell at a time through DataFrame.iloc into the legacy nested list,
+    the per-cell pandas overhead that load_maze's vectorized conversion is timed against.
+    """
+    import pandas as pd
+
+    maze = []
+    df = pd.read_excel(file_path)
+    for i in range(len(df)):
+        row = []
+        for j in range(len(df.iloc[i])):
+            row.append((i, j) if df.iloc[i, j] in [0, "G", "S"] else "-")
+        maze.append(row)
+    return maze
+
+def timed(function, *args):
+    """
+    Runs function(*args) and returns the elapsed wall time in seconds.
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def write_synthetic(directory, size, seed=0):
+    """
+    Writes the same random size x size maze as CSV, text and .npy files.
+    :return: list of the written file paths
+    """
+    import numpy as np
+
+    rng = random.Random(seed)
+    csv_path, text_path, npy_path = (os.path.join(directory, "maze" + extension) for extension in (".csv", ".txt", ".npy"))
+    with open(csv_path, "w") as csv_file, open(text_path, "w") as text_file:
+        for row in range(size):
+            cells = ["1" if rng.random() < 0.3 else "0" for _ in range(size)]
+            if row == 0:
+                cells[0] = "S"
+            if row == size - 1:
+                cells[-1] = "G"
+            csv_file.write(",".join(cells) + "\n")
+            text_file.write("".join(cells).replace("1", "#").replace("0", ".") + "\n")
+    with open(text_path) as text_file:
+        codes = [[{"#": 1, ".": 0}.get(char, ord(char)) for char in line.rstrip("\n")] for line in text_file]
+    np.save(npy_path, np.array(codes, dtype=np.uint8))
+    return [csv_path, text_path, npy_path]
+
+def main(cells=10_000_000):
+    fixtures = sorted(glob.glob("maze_tests/*.xlsx"))
+    # Keep the one-off pandas/openpyxl imports out of the first timing
+    load_maze(fixtures[0])
+    for file_path in fixtures:
+        print(f"{os.path.basename(file_path):>12}: load_maze {timed(load_maze, file_path) * 1000:8.1f} ms, "
+              f"iloc reader {timed(iloc_read_maze, file_path) * 1000:8.1f} ms")
+
+    size = int(cells ** 0.5)
+    with tempfile.TemporaryDirectory() as directory:
+        for file_path in write_synthetic(directory, size):
+            megabytes = os.path.getsize(file_path) / 2 ** 20
+            print(f"{os.path.basename(file_path):>12}: load_maze {timed(load_maze, file_path):8.2f} s "
+                  f"({size}x{size}, {megabytes:.0f} MB)")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
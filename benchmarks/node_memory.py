@@ -0,0 +1,103 @@
+"""
+Measures the memory cost of search nodes.
+
+Compares a __dict__-based node against the slotted Node, and the peak memory per expanded
+node of the array-based A* against the dict/set-based engine it replaced.
+
+Usage: python -m benchmarks.node_memory [size]
+"""
+import heapq
+import random
+import sys
+import tracemalloc
+from Node import Node
+from grid import Grid, ROAD
+from search import a_star, BFS, DFS
+#==============================================
+
+class DictNode:
+    """
+    Node without __slots__: every instance carries a __dict__, which is what the slotted Node saves.
+    """
+
+    def __init__(self, name, path=None, cost=None):
+        self.name = name
+        self.path = path
+        self.cost = cost
+
+def dict_a_star(grid, stats):
+    """
+    A* with its g-scores and parents in dicts and its closed set in a set, keyed by flat index,
+    whose peak memory per expanded node is compared with the array-based a_star.
+    """
+    start_index, goal_index = grid.index(grid.start), grid.index(grid.goal)
+    cells, offsets, cell = grid.cells, grid.offsets, grid.cell
+    h = lambda a, b: abs(b[0] - a[0]) + abs(b[1] - a[1])
+    queue = [(0, 0, 0, start_index)]
+    g_score = {start_index: 0}
+    came_from = {start_index: None}
+    closed = set()
+    counter = 1
+
+    while queue:
+        _, _, _, current = heapq.heappop(queue)
+        if current in closed:
+            continue
+        closed.add(current)
+        if current == goal_index:
+            break
+        g_cost = g_score[current] + 1
+        for offset in offsets:
+            node = current + offset
+            if cells[node] and node not in closed and g_cost < g_score.get(node, g_cost + 1):
+                g_score[node] = g_cost
+                came_from[node] = current
+                h_cost = h(cell(node), grid.goal)
+                heapq.heappush(queue, (g_cost + h_cost, h_cost, counter, node))
+                counter += 1
+    stats["expanded"] = len(closed)
+
+def random_grid(size, density=0.2, seed=0):
+    """
+    Builds a square grid with randomly placed walls and open corners.
+    """
+    rng = random.Random(seed)
+    grid = Grid(size, size, start=(0, 0), goal=(size - 1, size - 1))
+    for row in range(size):
+        for col in range(size):
+            if rng.random() >= density:
+                grid.set_cell((row, col), ROAD)
+    grid.set_cell(grid.start, ROAD)
+    grid.set_cell(grid.goal, ROAD)
+    return grid
+
+def peak_bytes(function, *args):
+    """
+    Runs function(*args) under tracemalloc and returns the peak traced memory in bytes.
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main(size=500):
+    count = 100_000
+    for node_class in (DictNode, Node):
+        peak = peak_bytes(lambda: [node_class(index, None, 0) for index in range(count)])
+        print(f"{node_class.__name__:>10}: {peak / count:7.1f} bytes per node")
+
+    grid = random_grid(size)
+    engines = [("dict A*", lambda stats: dict_a_star(grid, stats)),
+               ("a_star", lambda stats: a_star(grid, stats=stats)),
+               ("BFS", lambda stats: BFS(grid, stats=stats)),
+               ("DFS", lambda stats: DFS(grid, stats=stats))]
+    for name, engine in engines:
+        stats = {}
+        peak = peak_bytes(engine, stats)
+        print(f"{name:>10}: {peak / max(stats['expanded'], 1):7.1f} bytes per expanded node "
+              f"({stats['expanded']} expanded, {size}x{size})")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
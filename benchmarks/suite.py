@@ -0,0 +1,199 @@
+"""
+Benchmarks the search algorithms on generated mazes and checks them against a baseline.
+
+Every algorithm runs on seeded mazes of every kind (perfect, open rooms, random obstacles,
+no path, weighted terrain) and size, reporting the wall time (best of --repeat runs), the peak traced memory
+and the number of expanded nodes. The results are compared with the saved baseline: a
+different cost or number of expanded nodes, or a peak memory beyond the tolerance, is a
+regression, and the run exits with status 1. These are deterministic. Timings are not (runs
+of an unchanged tree on the same machine differ by a third), so a time beyond the tolerance
+is only reported as a warning, unless --strict-time makes it a regression too.
+
+It also imports search, maze and gui_maze in fresh interpreters with -X importtime. An import
+over its budget in IMPORT_BUDGETS, or one that loads a module it must defer (pandas and tkinter
+until a file is uploaded, for gui_maze), is a regression as well.
+
+Usage: python -m benchmarks.suite [--sizes 100,1000] [--kinds perfect,rooms,obstacles,no-path,terrain]
+                                  [--algo bfs,dfs,astar,dijkstra,jps] [--repeat 3] [--tolerance 0.25]
+                                  [--baseline FILE] [--save] [--no-imports] [--strict-time]
+
+The full range is --sizes 100,500,1000,2000,4000. --save merges the results into the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from generator import GENERATORS, generate
+from maze import ALGORITHMS, resolve
+#==============================================
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets of the cold import time of the modules, in seconds. Most of gui_maze's is pygame's own
+# import (about 0.2 s, as pygame itself imports numpy and pkg_resources).
+IMPORT_BUDGETS = {"search": 0.02, "maze": 0.1, "gui_maze": 0.4}
+
+# Modules each import must not load: they are imported when first needed
+DEFERRED_IMPORTS = {
+    "search": ("numpy", "pandas", "pygame"),
+    "maze": ("numpy", "pandas", "pygame", "tkinter"),
+    "gui_maze": ("pandas", "tkinter"),
+}
+
+# Timings this close to the baseline are never regressions, whatever the tolerance (timer noise)
+MIN_SLOWDOWN = 0.005
+
+def measure(function, grid, repeat):
+    """
+    Runs a search on a grid and measures it.
+    :return: dict with the best "seconds" of repeat runs, the "peak_kb" of traced memory,
+             the number of nodes "expanded" and the path "cost" (None if there is no path)
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        stats = {}
+        start = time.perf_counter()
+        path, cost = function(grid, stats=stats)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    # Memory is traced in a separate run, as tracing slows the search down. The first traced run
+    # also counts one-off allocations (e.g. of the interpreter's caches), so only the second counts.
+    tracemalloc.start()
+    function(grid)
+    tracemalloc.reset_peak()
+    function(grid)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dict(seconds=round(seconds, 6), peak_kb=round(peak / 1024, 1), expanded=stats.get("expanded"),
+                cost=cost if path is not None else None)
+
+def import_time(module, repeat):
+    """
+    Imports a module in fresh interpreters run with -X importtime.
+    :return: a tuple of the best cumulative import time in seconds of repeat runs,
+             and the set of the modules the import loaded
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        run = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        loaded = {}
+        for line in run.stderr.splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and fields[1].strip().isdigit():
+                loaded[fields[2].strip()] = int(fields[1])
+        seconds = min(seconds, loaded[module] / 1e6)
+    return round(seconds, 6), set(loaded)
+
+def compare(result, base, tolerance):
+    """
+    Compares a result with its baseline.
+    :return: a tuple of the list of regression descriptions and the description of a slowdown
+             beyond the tolerance (None if there is none)
+    """
+    problems = []
+    for key in ("cost", "expanded"):
+        if result[key] != base.get(key):
+            problems.append("%s %s -> %s" % (key, base.get(key), result[key]))
+    if result["peak_kb"] > base["peak_kb"] * (1 + tolerance):
+        problems.append("memory +%.0f%%" % (100 * (result["peak_kb"] / base["peak_kb"] - 1)))
+    slowdown = None
+    if result["seconds"] > base["seconds"] * (1 + tolerance) and result["seconds"] - base["seconds"] > MIN_SLOWDOWN:
+        slowdown = "time +%.0f%%" % (100 * (result["seconds"] / base["seconds"] - 1))
+    return problems, slowdown
+
+def load_baseline(file_path):
+    """
+    :return: the saved baseline cases, empty if the file does not exist
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path) as file:
+        return json.load(file)["cases"]
+
+def save_baseline(file_path, cases):
+    with open(file_path, "w") as file:
+        json.dump(dict(python=platform.python_version(), machine=platform.machine(), cases=cases),
+                  file, indent=1, sort_keys=True)
+        file.write("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="100,1000", help="comma-separated maze sizes (default: 100,1000)")
+    parser.add_argument("--kinds", default=",".join(GENERATORS), help="comma-separated maze kinds")
+    parser.add_argument("--algo", default="bfs,dfs,astar,dijkstra,jps", help="comma-separated algorithms")
+    parser.add_argument("--seed", type=int, default=0, help="the maze seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the best is kept (default: 3)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative increase of time and memory (default: 0.25)")
+    parser.add_argument("--baseline", default=BASELINE, help="the baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--no-imports", action="store_true", help="skip the import time budgets")
+    parser.add_argument("--strict-time", action="store_true",
+                        help="count times beyond the tolerance as regressions, not warnings")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    kinds = args.kinds.split(",")
+    algorithms = args.algo.split(",")
+    for name in kinds:
+        if name not in GENERATORS:
+            parser.error("unknown maze kind: %s" % name)
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            parser.error("unknown algorithm: %s" % name)
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    regressions = warnings = 0
+    for size in sizes:
+        for kind in kinds:
+            grid = generate(kind, size, args.seed)
+            for name in algorithms:
+                case = "%s/%d/%s" % (kind, size, name)
+                result = results[case] = measure(resolve(name), grid, args.repeat)
+                if args.save:
+                    status = "saved"
+                elif case not in baseline:
+                    status = "new"
+                else:
+                    problems, slowdown = compare(result, baseline[case], args.tolerance)
+                    if slowdown and args.strict_time:
+                        problems.append(slowdown)
+                    elif slowdown:
+                        warnings += 1
+                    regressions += bool(problems)
+                    status = ("REGRESSION: " + ", ".join(problems) if problems
+                              else "warning: " + slowdown if slowdown else "ok")
+                print(f"{case:<22} {result['seconds'] * 1000:10.1f} ms {result['peak_kb']:10.0f} KiB "
+                      f"{result['expanded']:>9} expanded  {status}", flush=True)
+
+    if not args.no_imports:
+        for module, budget in IMPORT_BUDGETS.items():
+            seconds, loaded = import_time(module, args.repeat)
+            problems = ["loads " + name for name in DEFERRED_IMPORTS[module] if name in loaded]
+            if seconds > budget:
+                problems.append("over budget")
+            regressions += bool(problems)
+            status = "REGRESSION: " + ", ".join(problems) if problems else "ok"
+            case = "import/" + module
+            print(f"{case:<22} {seconds * 1000:10.1f} ms {budget * 1000:10.0f} ms budget  {status}", flush=True)
+
+    if args.save:
+        save_baseline(args.baseline, {**baseline, **results})
+        print("Saved %d cases to %s" % (len(results), args.baseline))
+    else:
+        if warnings:
+            print("%d case(s) slower than the baseline; timings are noisy, rerun them before trusting it" % warnings)
+        if regressions:
+            print("%d regression(s) against %s" % (regressions, args.baseline))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+from grid import Grid, ROAD, WALL
+#==============================================
+
+# Header: magic, format version, flags, rows, cols, start row/col, goal row/col.
+# It is followed by the wall bitmap of the padded grid: bit i (little-endian bit order) is
+# set when flat index i is a block, so the bitmap indexes exactly like Grid.cells. With the
+# FLAG_WEIGHTS flag (version 2), the bitmap is followed by the cells themselves, one byte each,
+# for mazes with terrain weights.
+MAGIC = b"MAZE"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIIiiii")
+FLAG_WEIGHTS = 1
+
+# Total size in bytes of the parse cache; the least recently used mazes beyond it are deleted
+CACHE_LIMIT = 1 << 30
+
+# Names of the parse cache entries: the SHA-256 of the source, the format and loader versions
+_CACHE_NAME = re.compile(r"[0-9a-f]{64}\.v\d+(\.l\d+)?\.maze$")
+
+# Byte <-> bits tables for packing and unpacking eight cells at a time
+_UNPACK = [bytes(WALL if byte >> bit & 1 else ROAD for bit in range(8)) for byte in range(256)]
+_PACK = {cells: byte for byte, cells in enumerate(_UNPACK)}
+# Maps every cell value to WALL or ROAD (terrain weights count as roads)
+_NORMALIZE = bytes(WALL if value == WALL else ROAD for value in range(256))
+
+class PackedCells:
+    """
+    Read-only view of a wall bitmap, indexed like the bytearray of a Grid.
+
+    Attributes:
+    - buffer: The bitmap bytes (typically a memoryview of a memory-mapped file).
+    - length: The number of cells, i.e. len(grid.cells).
+    """
+
+    __slots__ = ("buffer", "length")
+
+    def __init__(self, buffer, length):
+        """
+        Initializes a view over a bitmap.
+
+        Parameters:
+        - buffer: The bitmap bytes (typically a memoryview of a memory-mapped file).
+        - length: The number of cells, i.e. len(grid.cells).
+        """
+        self.buffer = buffer
+        self.length = length
+
+    def __getitem__(self, index):
+        return WALL if self.buffer[index >> 3] >> (index & 7) & 1 else ROAD
+
+    def __len__(self):
+        return self.length
+
+    def tobytes(self):
+        """
+        :return: the cells unpacked into one byte per cell
+        """
+        return b"".join(map(_UNPACK.__getitem__, self.buffer))[:self.length]
+
+def pack(cells):
+    """
+    Packs one-byte-per-cell values into a wall bitmap.
+    :param cells: bytes or bytearray of cell values
+    :return: the bitmap bytes
+    """
+    cells = bytes(cells).translate(_NORMALIZE)
+    cells += bytes([WALL]) * (-len(cells) % 8)
+    return bytes(map(_PACK.__getitem__, (cells[i:i + 8] for i in range(0, len(cells), 8))))
+
+def save_binary(grid, file_path):
+    """
+    Writes a grid in the binary maze format, atomically replacing any existing file.
+    :param grid: the maze Grid
+    :param file_path: the path of the .maze file to write
+    """
+    weighted = grid.max_weight() > ROAD
+    header = HEADER.pack(MAGIC, VERSION, FLAG_WEIGHTS if weighted else 0, grid.rows, grid.cols, *grid.start, *grid.goal)
+    bitmap = grid.cells.buffer if isinstance(grid.cells, PackedCells) else pack(grid.cells)
+    temp_path = "%s.%d.tmp" % (file_path, os.getpid())
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(bitmap)
+        if weighted:
+            file.write(grid.cells)
+    os.replace(temp_path, file_path)
+
+def load_binary(file_path, packed=False):
+    """
+    Loads a maze written by save_binary.
+
+    With packed=True the file is memory-mapped and the grid reads its cells straight from the
+    bitmap, so even very large mazes are not copied into memory (the grid is then read-only).
+    Otherwise the bitmap is unpacked into a regular, faster bytearray grid. Mazes with terrain
+    weights are read from their byte-per-cell section instead, as a read-only memoryview of the
+    mapped file with packed=True.
+
+    :param file_path: the path of the .maze file
+    :param packed: whether to keep the grid memory-mapped and bit-packed
+    :return: a tuple containing the maze Grid, start position, and goal position
+    """
+    with open(file_path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, flags, rows, cols, start_row, start_col, goal_row, goal_col = HEADER.unpack_from(buffer)
+    if magic != MAGIC or not 1 <= version <= VERSION:
+        raise ValueError("%s is not a version 1 to %d binary maze" % (file_path, VERSION))
+
+    length = (rows + 2) * (cols + 2)
+    bitmap_end = HEADER.size + -(-length // 8)
+    bitmap = memoryview(buffer)[HEADER.size:bitmap_end]
+    cells = PackedCells(bitmap, length)
+    if flags & FLAG_WEIGHTS:
+        bitmap.release()
+        weights = cells = memoryview(buffer)[bitmap_end:bitmap_end + length]
+        if len(weights) != length:
+            raise ValueError("%s is truncated" % file_path)
+        if not packed:
+            cells = bytearray(weights)
+            weights.release()
+            buffer.close()
+    elif not packed:
+        cells = bytearray(cells.tobytes())
+        bitmap.release()
+        buffer.close()
+    grid = Grid(rows, cols, cells, (start_row, start_col), (goal_row, goal_col))
+    return grid, grid.start, grid.goal
+
+def file_hash(file_path):
+    """
+    Computes the SHA-256 digest of a file, reading it in chunks.
+    :param file_path: the path of the file
+    :return: the hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_dir():
+    """
+    :return: the directory holding preprocessed mazes ($MAZE_CACHE_DIR, or ~/.cache/maze-visualizer)
+    """
+    return os.environ.get("MAZE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "maze-visualizer")
+
+def prune_cache(directory, limit=None, keep=None):
+    """
+    Deletes the parse cache entries of other format or loader versions, which are never read
+    again, then the least recently used entries until the others fit in the limit.
+    :param directory: the cache directory
+    :param limit: the total size in bytes to keep (defaults to CACHE_LIMIT)
+    :param keep: the path of an entry never to delete, e.g. the one just written
+    :return: list of the deleted paths
+    """
+    from loaders import LOADER_VERSION
+
+    limit = CACHE_LIMIT if limit is None else limit
+    suffix = ".v%d.l%d.maze" % (VERSION, LOADER_VERSION)
+    stale, entries = [], []
+    for entry in os.scandir(directory):
+        if not _CACHE_NAME.match(entry.name) or not entry.is_file() or entry.path == keep:
+            continue
+        if entry.name.endswith(suffix):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        else:
+            stale.append(entry.path)
+
+    total = sum(size for _, size, _ in entries) + (os.path.getsize(keep) if keep else 0)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        stale.append(path)
+        total -= size
+
+    deleted = []
+    for path in stale:
+        try:
+            os.remove(path)
+            deleted.append(path)
+        except OSError:
+            pass  # e.g. removed meanwhile by another process
+    return deleted
+
+def load_cached(file_path, packed=False, directory=None):
+    """
+    Loads a maze from any supported file, parsing it only the first time its contents are seen.
+
+    The parsed maze is stored in the binary format under the SHA-256 of the source file and the
+    versions of the format and of the loaders, so reopening the same file, even under another
+    name, skips parsing entirely until a loader change may parse it differently. Every reuse
+    marks an entry as recently used, and the cache is pruned to CACHE_LIMIT as it grows.
+
+    :param file_path: the path of the maze file
+    :param packed: whether to keep the grid memory-mapped and bit-packed (see load_binary)
+    :param directory: the cache directory (defaults to cache_dir())
+    :return: a tuple containing the maze Grid, start position, and goal position
+    """
+    from loaders import LOADER_VERSION, load_maze
+
+    directory = directory or cache_dir()
+    cached_path = os.path.join(directory, "%s.v%d.l%d.maze" % (file_hash(file_path), VERSION, LOADER_VERSION))
+    if os.path.exists(cached_path):
+        try:
+            result = load_binary(cached_path, packed)
+        except (OSError, ValueError, struct.error):
+            pass  # Unreadable cache entry: parse the source again and overwrite it
+        else:
+            try:
+                os.utime(cached_path)  # Marks the entry as recently used for prune_cache()
+            except OSError:
+                pass  # A read-only cache is still read
+            return result
+
+    grid, start, goal = load_maze(file_path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        save_binary(grid, cached_path)
+        prune_cache(directory, keep=cached_path)
+    except OSError:
+        return grid, start, goal  # A read-only cache only costs the speed-up
+    return load_binary(cached_path, packed) if packed else (grid, start, goal)
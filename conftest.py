@@ -0,0 +1,2 @@
+# The modules live at the root of the repository; pytest puts the directory of this file on
+# sys.path, so the tests in tests/ import them directly.
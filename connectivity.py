@@ -0,0 +1,181 @@
+from array import array
+from collections import deque
+from grid import WALL, as_grid
+#==============================================
+
+class ComponentIndex:
+    """
+    Labels the connected components of a maze so reachability is answered in constant time.
+
+    Every road cell carries the label of its component. The labels are built once with a
+    flood fill and then kept up to date cell by cell: opening a cell merges the components
+    around it (relabeling the smaller ones), and closing one runs interleaved searches from
+    its neighbors, which stop as soon as they meet again or one side is found to be cut off.
+
+    Attributes:
+    - grid: The Grid being indexed.
+    - labels: array of the component label of every flat index, 0 for blocks.
+    - sizes: dict mapping every label to the number of cells in its component.
+    """
+
+    def __init__(self, maze):
+        """
+        Labels every component of the maze.
+
+        Parameters:
+        - maze: The maze grid representing the environment (a Grid or the legacy nested list).
+        """
+        self.grid = as_grid(maze)
+        self.labels = array("i", bytes(4 * len(self.grid.cells)))
+        self.sizes = {}
+        self._next_label = 1
+        cells, labels = self.grid.cells, self.labels
+        for index in range(len(cells)):
+            if cells[index] != WALL and not labels[index]:
+                self._flood(index, self._new_label())
+
+    def _new_label(self):
+        label = self._next_label
+        self._next_label += 1
+        self.sizes[label] = 0
+        return label
+
+    def _flood(self, index, label):
+        """
+        Gives a label to the component containing index, whatever its cells are labeled now.
+        """
+        cells, labels, offsets = self.grid.cells, self.labels, self.grid.offsets
+        labels[index] = label
+        queue = deque([index])
+        count = 1
+        while queue:
+            current = queue.popleft()
+            for offset in offsets:
+                node = current + offset
+                if cells[node] != WALL and labels[node] != label:
+                    labels[node] = label
+                    queue.append(node)
+                    count += 1
+        self.sizes[label] += count
+
+    def label(self, cell):
+        """
+        :param cell: Tuple (row, column)
+        :return: the component label of the cell, 0 if it is a block
+        """
+        return self.labels[self.grid.index(cell)]
+
+    def connected(self, a, b):
+        """
+        Checks whether a path exists between two cells.
+        :param a: Tuple (row, column)
+        :param b: Tuple (row, column)
+        :return: True if both cells are roads of the same component
+        """
+        label = self.label(a)
+        return label != 0 and label == self.label(b)
+
+    def update(self, cell):
+        """
+        Brings the labels up to date after the given cell of the grid was edited.
+        :param cell: Tuple (row, column)
+        """
+        index = self.grid.index(cell)
+        cells, labels = self.grid.cells, self.labels
+        neighbors = [index + offset for offset in self.grid.offsets if cells[index + offset] != WALL]
+        if cells[index] != WALL and not labels[index]:
+            self._open(index, neighbors)
+        elif cells[index] == WALL and labels[index]:
+            self._close(index, neighbors)
+
+    def _open(self, index, neighbors):
+        """
+        Joins a new road cell to the components around it, relabeling all but the largest.
+        """
+        around = {self.labels[node] for node in neighbors}
+        if not around:
+            label = self._new_label()
+            self.labels[index] = label
+            self.sizes[label] = 1
+            return
+        label = max(around, key=self.sizes.__getitem__)
+        self.labels[index] = label
+        self.sizes[label] += 1
+        for node in neighbors:
+            other = self.labels[node]
+            if other != label:
+                # The flood stops at the new cell, so it only relabels the smaller component
+                del self.sizes[other]
+                self._flood(node, label)
+
+    def _close(self, index, neighbors):
+        """
+        Removes a cell from its component, splitting off the parts it alone connected.
+
+        A breadth-first search runs from each neighbor, one step at a time in turn. Searches that
+        meet are merged, and a search that runs out of cells before meeting the last remaining one
+        has explored a part that is now cut off, which gets a new label. The work done is
+        proportional to the size of the parts split off, not of the whole component.
+        """
+        label = self.labels[index]
+        self.labels[index] = 0
+        self.sizes[label] -= 1
+        if len(neighbors) < 2:
+            if not self.sizes[label]:
+                del self.sizes[label]
+            return
+
+        cells, offsets = self.grid.cells, self.grid.offsets
+        # Union-find over the searches: group[i] is the search that search i was merged into
+        group = list(range(len(neighbors)))
+
+        def find(i):
+            while group[i] != i:
+                group[i] = group[group[i]]
+                i = group[i]
+            return i
+
+        owner = {node: i for i, node in enumerate(neighbors)}
+        frontiers = [deque([node]) for node in neighbors]
+        members = [[node] for node in neighbors]
+        active = list(range(len(neighbors)))
+
+        while len(active) > 1:
+            for i in list(active):
+                if find(i) != i:
+                    continue
+                if not frontiers[i]:
+                    # Cut off from every other search: a component of its own
+                    active.remove(i)
+                    new_label = self._new_label()
+                    for node in members[i]:
+                        self.labels[node] = new_label
+                    self.sizes[new_label] = len(members[i])
+                    self.sizes[label] -= len(members[i])
+                    if len(active) == 1:
+                        break
+                    continue
+
+                current = frontiers[i].popleft()
+                for offset in offsets:
+                    node = current + offset
+                    if cells[node] == WALL:
+                        continue
+                    other = owner.get(node)
+                    if other is None:
+                        owner[node] = i
+                        frontiers[i].append(node)
+                        members[i].append(node)
+                        continue
+                    j = find(other)
+                    if j != i:
+                        # The two searches met: the larger one absorbs the smaller and goes on
+                        big, small = (i, j) if len(members[i]) >= len(members[j]) else (j, i)
+                        group[small] = big
+                        frontiers[big].extend(frontiers[small])
+                        members[big].extend(members[small])
+                        frontiers[small], members[small] = None, None
+                        active.remove(small)
+                        i = big
+                if len(active) == 1:
+                    break
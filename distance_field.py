@@ -0,0 +1,104 @@
+from array import array
+import numpy as np
+from grid import WALL, as_grid
+from search import path_cost
+#==============================================
+
+# Frontiers narrower than this are expanded in plain Python, where NumPy's per-call overhead
+# would dominate (long corridors of perfect mazes advance one or two cells per wavefront)
+NARROW_FRONTIER = 48
+
+def distance_field(maze, sources=None):
+    """
+    Computes the BFS distance from the nearest source to every cell of the maze.
+
+    Each wavefront is expanded at once: the frontier's flat indices are shifted by the four
+    neighbor offsets and masked against the walls and the cells already reached.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param sources: Iterable of (row, column) cells at distance 0 (defaults to the grid's start).
+    :return: int32 array of shape (rows, cols) holding the distances, -1 for unreachable cells.
+    """
+    grid = as_grid(maze)
+    sources = [grid.start] if sources is None else list(sources)
+    # Bit-packed grids (binmaze.PackedCells) are unpacked once
+    cells = grid.cells if isinstance(grid.cells, (bytes, bytearray)) else grid.cells.tobytes()
+    offsets = np.array(grid.offsets, dtype=np.int32)
+
+    # Each NumPy array shares its buffer with a Python array, which is faster to index from Python
+    dist_view = array("i", [-1]) * len(cells)
+    dist = np.frombuffer(dist_view, dtype=np.int32)
+    unreached_view = bytearray(np.frombuffer(cells, dtype=np.uint8) != WALL)
+    unreached = np.frombuffer(unreached_view, dtype=np.bool_)
+    marker = np.empty(len(cells), dtype=np.int32)
+    frontier = [grid.index(cell) for cell in sources if not grid.is_wall(cell)]
+    dist[frontier] = 0
+    unreached[frontier] = False
+    d = 0
+
+    while len(frontier):
+        d += 1
+        if len(frontier) < NARROW_FRONTIER:
+            reached = []
+            for index in (frontier.tolist() if isinstance(frontier, np.ndarray) else frontier):
+                for offset in grid.offsets:
+                    node = index + offset
+                    if unreached_view[node]:
+                        unreached_view[node] = 0
+                        dist_view[node] = d
+                        reached.append(node)
+            frontier = reached
+            continue
+
+        neighbors = (np.asarray(frontier, dtype=np.int32)[:, None] + offsets).ravel()
+        neighbors = neighbors[unreached[neighbors]]
+        # Drop duplicates reached from two frontier cells: keep the last writer of each index
+        order = np.arange(len(neighbors), dtype=np.int32)
+        marker[neighbors] = order
+        frontier = neighbors[marker[neighbors] == order]
+        unreached[frontier] = False
+        dist[frontier] = d
+
+    return dist.reshape(grid.rows + 2, grid.stride)[1:-1, 1:-1]
+
+def descend(field, goal):
+    """
+    Follows the distance field downhill from the goal to the nearest source.
+
+    :param field: The array returned by distance_field.
+    :param goal: The target position to reach in the maze.
+    :return: A tuple containing the path with the fewest moves from a source to the goal and its number of moves.
+    """
+    row, col = goal
+    rows, cols = field.shape
+    if field[row, col] < 0:
+        return None, 0
+
+    path = [(row, col)]
+    d = int(field[row, col])
+    while d > 0:
+        for next_row, next_col in ((row, col + 1), (row - 1, col), (row + 1, col), (row, col - 1)):
+            if 0 <= next_row < rows and 0 <= next_col < cols and field[next_row, next_col] == d - 1:
+                row, col, d = next_row, next_col, d - 1
+                path.append((row, col))
+                break
+    path.reverse()
+    return path, len(path) - 1
+
+def flood_fill(maze, start=None, goal=None, stats=None):
+    """
+    Finds the path with the fewest moves from the start position to the goal position through the full
+    distance field. Terrain weights do not steer the path, but its weighted cost is reported.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :return: A tuple containing the path from start to end and its cost (see search.path_cost).
+    """
+    grid = as_grid(maze, start, goal)
+    field = distance_field(grid, [start or grid.start])
+    if stats is not None:
+        stats["expanded"] = int(np.count_nonzero(field >= 0))
+    path, _ = descend(field, goal or grid.goal)
+    return (path, path_cost(grid, path)) if path else (None, 0)
@@ -0,0 +1,165 @@
+import random
+from grid import Grid, ROAD, WALL
+#==============================================
+
+def _fill(grid, values):
+    """
+    Copies row-major bytes of rows * cols cell values into the inside of a grid's padded array.
+    """
+    cells, stride, cols = grid.cells, grid.stride, grid.cols
+    for row in range(grid.rows):
+        begin = (row + 1) * stride + 1
+        cells[begin:begin + cols] = values[row * cols:(row + 1) * cols]
+
+def perfect_maze(rows, cols, seed=0):
+    """
+    Generates a perfect maze (exactly one path between any two roads) with a randomized
+    depth-first backtracker. Rooms sit on even (row, column) cells and the walls between
+    them on odd ones; the goal is the bottom-right room.
+
+    :param rows: The number of rows in the maze.
+    :param cols: The number of columns in the maze.
+    :param seed: The random seed, so the same arguments always give the same maze.
+    :return: the maze Grid
+    """
+    rng = random.Random(seed)
+    grid = Grid(rows, cols, start=(0, 0), goal=((rows - 1) // 2 * 2, (cols - 1) // 2 * 2))
+    cells, stride = grid.cells, grid.stride
+
+    # Rooms are tracked in their own padded array, so stepping from one to the next never leaves it
+    room_rows, room_cols = (rows + 1) // 2, (cols + 1) // 2
+    room_stride = room_cols + 2
+    unvisited = bytearray((room_rows + 2) * room_stride)
+    for row in range(room_rows):
+        begin = (row + 1) * room_stride + 1
+        unvisited[begin:begin + room_cols] = b"\1" * room_cols
+    room_offsets = (1, -room_stride, room_stride, -1)
+
+    def to_index(room):
+        row, col = divmod(room, room_stride)
+        return (2 * row - 1) * stride + 2 * col - 1
+
+    first = room_stride + 1
+    unvisited[first] = 0
+    cells[to_index(first)] = ROAD
+    stack = [first]
+    while stack:
+        room = stack[-1]
+        options = [room + offset for offset in room_offsets if unvisited[room + offset]]
+        if not options:
+            stack.pop()
+            continue
+        next_room = options[0] if len(options) == 1 else rng.choice(options)
+        unvisited[next_room] = 0
+        current, following = to_index(room), to_index(next_room)
+        cells[(current + following) // 2] = ROAD
+        cells[following] = ROAD
+        stack.append(next_room)
+    return grid
+
+def open_rooms(rows, cols, seed=0, room=16):
+    """
+    Generates open rooms separated by straight walls, with one random door between every
+    two neighboring rooms.
+
+    :param rows: The number of rows in the maze.
+    :param cols: The number of columns in the maze.
+    :param seed: The random seed, so the same arguments always give the same maze.
+    :param room: The side of a room, in cells.
+    :return: the maze Grid
+    """
+    rng = random.Random(seed)
+    grid = Grid(rows, cols, start=(0, 0), goal=(rows - 1, cols - 1))
+    # Wall lines run every room + 1 cells, leaving the last row and column open
+    wall_rows = list(range(room, rows - 1, room + 1))
+    wall_cols = list(range(room, cols - 1, room + 1))
+
+    open_row = bytearray([ROAD]) * cols
+    for col in wall_cols:
+        open_row[col] = WALL
+    values = bytearray()
+    for row in range(rows):
+        values += bytes(cols) if row in wall_rows else open_row
+    _fill(grid, values)
+
+    row_spans = list(zip([0] + [row + 1 for row in wall_rows], wall_rows + [rows]))
+    col_spans = list(zip([0] + [col + 1 for col in wall_cols], wall_cols + [cols]))
+    for wall_row in wall_rows:
+        for begin, end in col_spans:
+            grid.set_cell((wall_row, rng.randrange(begin, end)), ROAD)
+    for wall_col in wall_cols:
+        for begin, end in row_spans:
+            grid.set_cell((rng.randrange(begin, end), wall_col), ROAD)
+    return grid
+
+def random_obstacles(rows, cols, seed=0, density=0.25, max_weight=ROAD):
+    """
+    Generates a maze of randomly scattered blocks, with the start and goal in opposite corners
+    (whose 2x2 squares are kept clear, so neither is walled in by its two neighbors).
+
+    :param rows: The number of rows in the maze.
+    :param cols: The number of columns in the maze.
+    :param seed: The random seed, so the same arguments always give the same maze.
+    :param density: The probability of each cell being a block.
+    :param max_weight: The heaviest terrain weight; the other cells get weights from 1 to it.
+    :return: the maze Grid
+    """
+    rng = random.Random(seed)
+    grid = Grid(rows, cols, start=(0, 0), goal=(rows - 1, cols - 1))
+    # One random byte per cell, mapped to WALL below the density threshold and to a weight above it
+    threshold = round(density * 256)
+    table = bytes(WALL if value < threshold else ROAD + (value - threshold) * max_weight // (256 - threshold)
+                  for value in range(256))
+    _fill(grid, rng.randbytes(rows * cols).translate(table))
+    for row in (0, 1, rows - 2, rows - 1):
+        for col in ((0, 1) if row < 2 else (cols - 2, cols - 1)):
+            grid.set_cell((row, col), ROAD)
+    return grid
+
+def no_path(rows, cols, seed=0, density=0.25):
+    """
+    Generates random obstacles cut in two by a full column of blocks, so the goal is never
+    reachable and every search explores the whole left half.
+
+    :param rows: The number of rows in the maze.
+    :param cols: The number of columns in the maze.
+    :param seed: The random seed, so the same arguments always give the same maze.
+    :param density: The probability of each other cell being a block.
+    :return: the maze Grid
+    """
+    grid = random_obstacles(rows, cols, seed, density)
+    for row in range(rows):
+        grid.set_cell((row, cols // 2), WALL)
+    return grid
+
+def weighted_terrain(rows, cols, seed=0, density=0.1, max_weight=9):
+    """
+    Generates random obstacles on terrain of random weights, so the cheapest path is rarely the
+    one with the fewest moves.
+
+    :param rows: The number of rows in the maze.
+    :param cols: The number of columns in the maze.
+    :param seed: The random seed, so the same arguments always give the same maze.
+    :param density: The probability of each cell being a block.
+    :param max_weight: The heaviest terrain weight; the other cells get weights from 1 to it.
+    :return: the maze Grid
+    """
+    return random_obstacles(rows, cols, seed, density, max_weight)
+
+GENERATORS = {
+    "perfect": perfect_maze,
+    "rooms": open_rooms,
+    "obstacles": random_obstacles,
+    "no-path": no_path,
+    "terrain": weighted_terrain,
+}
+
+def generate(kind, size, seed=0):
+    """
+    Generates a square maze of the given kind.
+    :param kind: a key of GENERATORS ("perfect", "rooms", "obstacles", "no-path" or "terrain")
+    :param size: The number of rows and columns.
+    :param seed: The random seed.
+    :return: the maze Grid
+    """
+    return GENERATORS[kind](size, size, seed)
@@ -0,0 +1,137 @@
+WALL = 0
+ROAD = 1
+# Heavier terrain is stored as its weight, the cost of entering the cell, up to MAX_WEIGHT
+MAX_WEIGHT = 255
+
+
+class Grid:
+    """
+    Represents a maze as a flat, padded byte array.
+
+    The grid is stored row-major with a one-cell border of walls around it, so
+    every neighbor of an interior cell is a constant offset away and the search
+    engines never need bounds checks.
+
+    Attributes:
+    - rows: The number of rows in the maze.
+    - cols: The number of columns in the maze.
+    - stride: The length of one padded row (cols + 2).
+    - cells: bytearray of (rows + 2) * stride values, WALL (0) for blocks, ROAD (1) for roads,
+      and 2 to MAX_WEIGHT for heavier terrain. Every value but WALL is the cost of entering the cell.
+    - start: Tuple (row, column) of the starting point.
+    - goal: Tuple (row, column) of the goal point.
+    - offsets: Index offsets of the four neighbors, in the same order the original
+      check_next_node directions ("ESNW") were tried.
+    """
+
+    def __init__(self, rows, cols, cells=None, start=(0, 0), goal=(0, 0)):
+        """
+        Initializes a new grid, all walls unless cells is given.
+
+        Parameters:
+        - rows: The number of rows in the maze.
+        - cols: The number of columns in the maze.
+        - cells: Optional padded bytearray to use as the cell storage.
+        - start: Tuple (row, column) of the starting point.
+        - goal: Tuple (row, column) of the goal point.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.cells = cells if cells is not None else bytearray((rows + 2) * self.stride)
+        self.start = start
+        self.goal = goal
+        self.offsets = (1, -self.stride, self.stride, -1)
+
+    def index(self, cell):
+        """
+        Converts a (row, column) tuple into its index in the cells array.
+        :param cell: Tuple (row, column)
+        :return: the flat index of the cell
+        """
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def cell(self, index):
+        """
+        Converts an index in the cells array back into a (row, column) tuple.
+        :param index: the flat index of the cell
+        :return: Tuple (row, column)
+        """
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+
+    def is_wall(self, cell):
+        """
+        Checks whether the given (row, column) cell is a block.
+        :param cell: Tuple (row, column)
+        :return: True if the cell is a wall or lies outside the maze
+        """
+        row, col = cell
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return True
+        return self.cells[self.index(cell)] == WALL
+
+    def set_cell(self, cell, value):
+        """
+        Sets the value of the given (row, column) cell.
+        :param cell: Tuple (row, column)
+        :param value: WALL, ROAD or a terrain weight up to MAX_WEIGHT
+        """
+        self.cells[self.index(cell)] = value
+
+    def max_weight(self):
+        """
+        Finds the cost of entering the most expensive cell of the maze.
+        :return: the largest terrain weight, ROAD (1) if the maze only has roads and blocks
+        """
+        if not isinstance(self.cells, (bytes, bytearray, memoryview)):
+            return ROAD  # Bit-packed cells only hold roads and blocks
+        return max(bytes(self.cells).translate(None, bytes((WALL, ROAD))), default=ROAD)
+
+    def neighbors(self, index):
+        """
+        Yields the indices of the open neighbors of the given index.
+        :param index: the flat index of the current cell
+        """
+        cells = self.cells
+        for offset in self.offsets:
+            if cells[index + offset] != WALL:
+                yield index + offset
+
+    def to_maze(self):
+        """
+        Converts the grid back into the legacy nested-list format, where roads are
+        (row, column) tuples and blocks are "-".
+        :return: 2D list representing the maze grid
+        """
+        return [["-" if self.is_wall((row, col)) else (row, col) for col in range(self.cols)]
+                for row in range(self.rows)]
+
+    @classmethod
+    def from_maze(cls, maze, start, goal):
+        """
+        Builds a grid from the legacy nested-list format.
+        :param maze: 2D list where roads are (row, column) tuples and blocks are "-"
+        :param start: Tuple (row, column) of the starting point
+        :param goal: Tuple (row, column) of the goal point
+        :return: the equivalent Grid
+        """
+        grid = cls(len(maze), len(maze[0]) if maze else 0, start=start, goal=goal)
+        for row, values in enumerate(maze):
+            for col, value in enumerate(values):
+                if value != "-":
+                    grid.set_cell((row, col), ROAD)
+        return grid
+
+
+def as_grid(maze, start=None, goal=None):
+    """
+    Returns the given maze as a Grid, adapting the legacy nested-list format if needed.
+    :param maze: a Grid or a 2D list where roads are (row, column) tuples and blocks are "-"
+    :param start: optional Tuple (row, column) overriding the starting point
+    :param goal: optional Tuple (row, column) overriding the goal point
+    :return: a Grid
+    """
+    if not isinstance(maze, Grid):
+        return Grid.from_maze(maze, start or (0, 0), goal or (0, 0))
+    return maze
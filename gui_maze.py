@@ -1,49 +1,97 @@
 import pygame 
-import math
+import argparse
 import sys
+import time
 import pygame.freetype
+from collections import deque
 from pygame.locals import *
-import pandas as pd
-from tkinter import Tk, filedialog
-from Node import Node
+from binmaze import load_cached
+from search import DFS, BFS, a_star, dijkstra, jump_point_search, STEPS, EXPANDED, FRONTIER, PATH_FOUND
+from solve_cache import SolveCache
+from lpa_star import LPAStar
+from connectivity import ComponentIndex
+from renderer import MazeRenderer, PathAnimation, EXPANDED_COLOR, FRONTIER_COLOR
+from profiler import PROFILER, profiled_steps
+from worker import Worker, PROGRESS, DONE, FAILED
 #==============================================
 
 def upload_excel_file():
     """ 
-    Prompts the user to select an Excel file using a file dialog window and returns the selected file's path.
-    :return: the path of the selected Excel file
+    Prompts the user to select a maze file using a file dialog window and returns the selected file's path.
+    :return: the path of the selected maze file
     """
+    # tkinter is only needed for the dialog, so it is imported on the first upload rather than at startup
+    from tkinter import Tk, filedialog
     root = Tk()
     root.withdraw()  # Hide the main tkinter window
-    file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
+    file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls"),
+                                                      ("Maze files", "*.csv;*.txt;*.npy;*.maze"),
+                                                      ("All files", "*.*")])
     root.destroy()
     return file_path
 
 def read_maze(file_path):
     """
-    Reads the maze from an Excel file and extracts the maze layout along with the start and goal positions.
-    :param file_path: the path to the Excel file containing the maze layout
-    :return: a tuple containing the maze layout, start position, and goal position
+    Reads the maze from a file and extracts the maze layout along with the start and goal positions.
+    Files are only parsed the first time; afterwards the preprocessed copy in the maze cache is used.
+    :param file_path: the path to the Excel (or CSV, text, .npy, .maze) file containing the maze layout
+    :return: a tuple containing the maze Grid, start position, and goal position
     """
-    maze = []
-    goal = (0, 0)
-    start = (0, 0)
-    df = pd.read_excel(file_path)
-    
-    for i in range(len(df)):
-        row = []
-        for j in range(len(df.iloc[i])):
-            if df.iloc[i, j] in [0, "G", "S"]:
-                if df.iloc[i, j] == "G":
-                    goal = (i, j)
-                if df.iloc[i, j] == "S":
-                    start = (i, j)
-                row.append((i, j))
-            else:
-                row.append("-")
-        maze.append(row)
+    return load_cached(file_path)
 
-    return maze, start, goal
+def load_job(job, file_path):
+    """
+    Reads a maze on the worker thread and prepares it for editing: the ComponentIndex is built
+    and the LPAStar planner runs its first, complete search, so the first edit only replans.
+    :param job: the worker.Job running the load
+    :param file_path: the path of the maze file
+    :return: a tuple containing the maze Grid, start position, goal position, LPAStar planner and ComponentIndex
+    """
+    with PROFILER.timer("load"):
+        maze, start, goal = read_maze(file_path)
+        planner = LPAStar(maze, start, goal)
+        components = ComponentIndex(planner.grid)
+        # A goal cut off from the start is not searched for until an edit reconnects it
+        if components.connected(start, goal):
+            planner.plan(checkpoint=job.checkpoint)
+    return maze, start, goal, planner, components
+
+def search_job(job, algorithm, maze, start, goal):
+    """
+    Runs a search step by step on the worker thread and reports every batch of events (see search.py)
+    to the main loop, which paints them. Every batch is a cancellation checkpoint.
+    :param job: the worker.Job running the search
+    :param algorithm: the search function, a key of search.STEPS
+    :param maze: the maze Grid
+    :param start: the start position
+    :param goal: the goal position
+    """
+    steps = STEPS[algorithm](maze, start, goal)
+    if PROFILER.enabled:
+        steps = profiled_steps(PROFILER, algorithm.__name__, steps)
+    try:
+        for events in steps:
+            job.report(events)
+    finally:
+        steps.close()
+
+def replan_job(job, planner, components, cell):
+    """
+    Toggles a cell between road and block and replans the path on the worker thread.
+    The planner is only touched by jobs, which run one at a time, so an edit never races a replan.
+    A cancelled replan keeps the planner consistent, and the next one resumes its work.
+    :param job: the worker.Job running the replan
+    :param planner: the LPAStar planner of the maze
+    :param components: the ComponentIndex of the maze
+    :param cell: the (row, column) cell to toggle
+    :return: a tuple containing the new path (None if there is none) and its cost
+    """
+    planner.toggle(cell)
+    components.update(cell)
+    # A goal cut off from the start needs no replanning until it is reconnected
+    if not components.connected(planner.start, planner.goal):
+        return None, 0
+    return planner.plan(checkpoint=job.checkpoint)
 
 def create_btn(screen, btn_rect, color, text, font_size, font_type, font_color):
     """
@@ -109,275 +157,47 @@ def create_text(screen, position, text, font_size, font_type, font_color, rect=N
             screen.blit(text_surface, text_rect)  # Blit the text onto the screen without background
             y += font_size + 10  # Adjust spacing between lines
 
-def draw_maze(screen, width, height, maze, start, goal, animation, path=None):
-    """
-    Renders the maze grid and icons on the given Pygame screen.
-    :param screen: Pygame screen object to render the maze on
-    :param width: Width of the screen
-    :param height: Height of the screen
-    :param maze: 2D list representing the maze grid
-    :param start: Tuple representing the coordinates of the starting point (row, column)
-    :param goal: Tuple representing the coordinates of the goal point (row, column)
-    :param animation: Boolean indicating whether animation is enabled
-    :param path: List of tuples representing the cells of the path to be highlighted
-    """
-    rows, columns = len(maze), len(maze[0])
-    rect_x, rect_y = 50, 50  # Define the position of the maze grid
-
-    # Load maze icons
-    goal_icon = pygame.image.load('img/target.png')
-    start_icon = pygame.image.load('img/finish-flag2.png')
-
-
-    # Calculate cell dimensions
-    cell_width = (width - rect_x * 2) // columns
-    rect_width = cell_width * columns
-    cell_height = (height - rect_y * 3.5) // rows
-    rect_height = cell_height * rows
-
-    # Draw the outer rectangle with white border
-    pygame.draw.rect(screen, (255, 255, 255), (rect_x - 1, rect_y - 1, rect_width + 1, rect_height + 1), 1)
-
-    # Draw horizontal lines (rows)
-    for row in range(1, rows):
-        y = rect_y + row * cell_height
-        pygame.draw.line(screen, (255, 255, 255), (rect_x, y), (rect_x + rect_width, y), 1)
-
-    # Draw vertical lines (columns)
-    for col in range(1, columns):
-        x = rect_x + col * cell_width
-        pygame.draw.line(screen, (255, 255, 255), (x, rect_y), (x, rect_y + rect_height), 1)
-
-    # Fill each cell with color based on maze values
-    for row in range(rows):
-        for col in range(columns):
-            cell_x = rect_x + col * cell_width
-            cell_y = rect_y + row * cell_height
-
-            pygame.draw.rect(screen, (255, 255, 255), (cell_x + 1, cell_y + 1, cell_width - 2, cell_height - 2), 1)
-
-            if maze[row][col] == "-":
-                pygame.draw.rect(screen, (155, 93, 118), (cell_x + 1, cell_y + 1, cell_width - 2, cell_height - 2), 0)
-            else:
-                pygame.draw.rect(screen, (109, 79, 107), (cell_x + 1, cell_y + 1, cell_width - 2, cell_height - 2), 0)
-
-                if path and animation:
-                    animate_path(screen, path, rect_x, rect_y, cell_width, cell_height, start, goal, start_icon,
-                                 goal_icon)
-                    animation = False
-
-                if path and not animation and (row, col) in path:
-                    pygame.draw.rect(screen, (195,197,187), (cell_x + 1, cell_y + 1, cell_width - 2, cell_height - 2),
-                                     0)
-
-                if maze[row][col] == start:
-                    # Blit the start icon
-                    icon_width = min(cell_width, cell_height)
-                    icon_height = min(cell_width, cell_height)
-                    scaled_icon = pygame.transform.scale(start_icon, (icon_width - 10, icon_height - 10))
-                    icon_rect = scaled_icon.get_rect(center=(cell_x + cell_width // 2, cell_y + cell_height // 2))
-                    screen.blit(scaled_icon, icon_rect)
-
-                if maze[row][col] == goal:
-                    # Blit the goal icon
-                    icon_width = min(cell_width, cell_height)
-                    icon_height = min(cell_width, cell_height)
-                    scaled_icon = pygame.transform.scale(goal_icon, (icon_width - 10, icon_height - 10))
-                    icon_rect = scaled_icon.get_rect(center=(cell_x + cell_width // 2, cell_y + cell_height // 2))
-                    screen.blit(scaled_icon, icon_rect)
-
-def animate_path(screen, path, rect_x, rect_y, cell_width, cell_height, start, goal, start_icon, goal_icon):
+def hud_lines(profiler, algorithm=None):
     """
-    Animates the path on the screen, highlighting the cells in the given path.
-    :param screen: Pygame screen object to render the animation
-    :param path: List of tuples representing the cells in the path
-    :param rect_x: X-coordinate of the top-left corner of the maze grid
-    :param rect_y: Y-coordinate of the top-left corner of the maze grid
-    :param cell_width: Width of each cell in the maze grid
-    :param cell_height: Height of each cell in the maze grid
-    :param start: Tuple representing the coordinates of the starting point (row, column)
-    :param goal: Tuple representing the coordinates of the goal point (row, column)
-    :param start_icon: Image object for the start icon
-    :param goal_icon: Image object for the goal icon
+    Formats the latest timings and search counters of the profiler for the HUD.
+    :param profiler: the Profiler being displayed
+    :param algorithm: the name of the last search run, if any
+    :return: list of text lines
     """
-    for cell in path:
-        row, col = cell
-        cell_x = rect_x + col * cell_width
-        cell_y = rect_y + row * cell_height
-        
-        # Highlight the cell in the path
-        pygame.draw.rect(screen, (195,197,187), (cell_x + 1, cell_y + 1, cell_width - 2, cell_height - 2), 0)  
-        
-        # Blit the goal icon if the current cell is the goal
-        if (row, col) == goal:
-            icon_width = min(cell_width, cell_height)
-            icon_height = min(cell_width, cell_height)
-            scaled_icon = pygame.transform.scale(goal_icon, (icon_width - 10, icon_height - 10))
-            icon_rect = scaled_icon.get_rect(center=(cell_x + cell_width // 2, cell_y + cell_height // 2))
-            screen.blit(scaled_icon, icon_rect)
-        
-        # Blit the start icon if the current cell is the start
-        if (row, col) == start:
-            icon_width = min(cell_width, cell_height)
-            icon_height = min(cell_width, cell_height)
-            scaled_icon = pygame.transform.scale(start_icon, (icon_width - 10, icon_height - 10))
-            icon_rect = scaled_icon.get_rect(center=(cell_x + cell_width // 2, cell_y + cell_height // 2))
-            screen.blit(scaled_icon, icon_rect)
-        
-        # Update the display
-        pygame.display.flip()
-        pygame.time.wait(100)
-          
-def DFS(maze, start, goal):
-    """
-    Performs a depth-first search (DFS) algorithm to find a path from the start position to the end position in a maze.
-
-    :param maze: The maze grid representing the environment.
-    :param start: The starting position in the maze.
-    :param goal: The target position to reach in the maze.
-    :return: A tuple containing the path from start to end and its length.
+    def ms(name):
+        return "%.1f" % (profiler.last(name) * 1000)
+
+    lines = ["frame %s ms | background %s | maze %s | widgets %s | flip %s | animation %s"
+             % (ms("frame"), ms("background"), ms("maze"), ms("widgets"), ms("flip"), ms("animation")),
+             "load %s ms | search batch %s ms" % (ms("load"), ms("search"))]
+    counters = profiler.counters
+    if algorithm is not None and algorithm + ".expanded" in counters:
+        lines.append("%s: %d expanded, max frontier %d, +%d blocks, %.1f ms"
+                     % (algorithm, counters[algorithm + ".expanded"], counters[algorithm + ".max_frontier"],
+                        counters[algorithm + ".allocated_blocks"], counters[algorithm + ".seconds"] * 1000))
+    return lines
+
+def draw_hud(screen, rect, lines, font):
     """
-    explored = set()
-    stack = [Node(start, [], 0)]
-    path = []
-
-    while stack:
-        current = stack.pop()
-        path += [current.name]
-        
-        if current.name == goal:
-            return current.path, len(current.path)
-
-        for direction in "ESNW":
-            node = check_next_node(maze, current.name, direction)
-            if node != "-" and node is not None and node not in explored:
-                explored.add(node)
-                stack.append(Node(node, path, current.cost + 1))
-
-    return None, 0
-                       
-def BFS(maze, start, goal):
-    """
-    Performs a breadth-first search (BFS) algorithm to find a path from the start position to the goal position in a maze.
-
-    :param maze: The maze grid representing the environment.
-    :param start: The starting position in the maze.
-    :param goal: The target position to reach in the maze.
-    :return: A tuple containing the path from start to end and its length.
-    """
-    explored = set()
-    queue = [Node(start, [], 0)]
-    path = []
-    cost = 0
-    
-    while queue:
-        current = queue.pop(0)
-        cost += 1
-        path.append(current.name)
-        
-        if current.name == goal:
-            return current.path, cost
-        
-        for direction in "ESNW":
-            node = check_next_node(maze, current.name, direction)
-            if node != "-" and node is not None and node not in explored:
-                explored.add(node)
-                queue.append(Node(node, path, cost))
-                
-    return None, 0
-   
-def heuristic(a, b):
+    Draws the profiling HUD: a dark band holding one line of text per entry of lines.
+    :param screen: the pygame screen to draw the HUD on
+    :param rect: the pygame.Rect of the band
+    :param lines: the text lines to show
+    :param font: the pygame font to render them with
     """
-    Calculates the heuristic (estimated) cost from node 'a' to node 'b' using the Euclidean distance formula.
+    screen.fill((30, 30, 30), rect)
+    for i, line in enumerate(lines):
+        screen.blit(font.render(line, True, (255, 255, 255)), (rect.x + 6, rect.y + 2 + i * 15))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive maze solver.")
+    parser.add_argument("--profile", nargs="?", const="maze_profile", metavar="PREFIX",
+                        help="profile the whole session and write PREFIX.prof (cProfile) and PREFIX.json "
+                             "(timings trace) on exit (default prefix: maze_profile)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        PROFILER.enable(trace=True, profile=True)
 
-    :param a: The current node position.
-    :param b: The goal node position.
-    :return: The heuristic cost from 'a' to 'b'.
-    """
-    h_cost = math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
-    return h_cost
-
-def a_star(maze, start, goal):
-    """
-    Performs the A* search algorithm to find the shortest path from the start position to the end position in a maze.
-
-    :param maze: The maze grid representing the environment.
-    :param start: The starting position in the maze.
-    :param goal: The target position to reach in the maze.
-    :return: A tuple containing the path from start to end and its length.
-    """
-    explored = set()
-    g_cost = 0
-    queue = [Node((start, heuristic(start, goal), g_cost + 1))]
-    came_from = {start: None}
-    
-    while queue:
-        queue.sort(key=lambda x: x.name[1])
-        current = queue.pop(0)
-        explored.add(current)
-        
-        if current.name[0] == goal:
-            path = [goal]
-            while came_from[goal] is not None:
-                path.append(came_from[goal])
-                goal = came_from[goal]
-            cost = len(path) - 1
-            path = list(reversed(path))
-            return path, cost
-        
-        for direction in "ENSW":
-            node = check_next_node(maze, current.name[0], direction)
-            if node != "-" and node is not None and node not in explored:
-                g_cost = current.name[2]
-                f_cost = heuristic(node, goal) + g_cost + 1
-                if node != start and node not in explored:
-                    came_from[node] = current.name[0]
-                explored.add(node)
-                queue.append(Node((node, f_cost, g_cost + 1)))
-                
-    return None, 0     
-        
-def check_next_node(maze, current_node, direction):
-    """
-    Checks the next node in the specified direction within the maze.
-
-    :param maze: The maze grid representing the environment.
-    :param current_node: The current position in the maze.
-    :param direction: The direction to check for the next node (E, S, N, W).
-    :return: The next node in the specified direction or None if it's out of bounds.
-    """
-    current_row, current_col = current_node
-
-    if direction == "E" and current_col + 1 < len(maze[0]):
-        return maze[current_row][current_col + 1]
-    elif direction == "S" and current_row - 1 >= 0:
-        return maze[current_row - 1][current_col]
-    elif direction == "N" and current_row + 1 < len(maze):
-        return maze[current_row + 1][current_col]
-    elif direction == "W" and current_col - 1 >= 0:
-        return maze[current_row][current_col - 1]
-    else:
-        return None
-
-def make_gradient_background(screen, color1, color2, width, height):
-    """
-    Generates a gradient background on the given Pygame screen.
-
-    :param screen: Pygame screen surface to draw the gradient background on.
-    :param color1: Starting color of the gradient as a tuple (R, G, B).
-    :param color2: Ending color of the gradient as a tuple (R, G, B).
-    :param width: Width of the screen.
-    :param height: Height of the screen.
-    """
-    for y in range(height):
-        # Interpolate colors between color1 and color2 based on the current height
-        r = int(color1[0] + (color2[0] - color1[0]) * (y / height))
-        g = int(color1[1] + (color2[1] - color1[1]) * (y / height))
-        b = int(color1[2] + (color2[2] - color1[2]) * (y / height))
-        # Draw a horizontal line with the interpolated color
-        pygame.draw.line(screen, (r, g, b), (0, y), (width, y))
-       
-def main():
     # Define window dimensions
     WINDOW_WIDTH = 800
     WINDOW_HEIGHT = 700
@@ -395,6 +215,8 @@ def main():
     RED = (235, 80, 98)
     YELLOW = (243, 202, 50)
     ORANGE = (255,160,105)
+    GREEN = (94, 186, 125)
+    TEAL = (64, 160, 165)
     
     
 
@@ -410,128 +232,306 @@ def main():
 
     # Define button rectangles
     upload_btn_rect1 = pygame.Rect(WINDOW_WIDTH / 2.75, WINDOW_HEIGHT / 1.9, 200, 50)
-    upload_btn_rect2 = pygame.Rect(410, 580, 100, 40)
-    dfs_btn_rect = pygame.Rect(50, 580, 80, 40)
-    bfs_btn_rect = pygame.Rect(140, 580, 80, 40)
-    astar_btn_rect = pygame.Rect(230, 580, 80, 40)
-    reset_btn_rect = pygame.Rect(320, 580, 80, 40)
-    output_btn_rect = pygame.Rect(520, 580, 230, 40)
+    upload_btn_rect2 = pygame.Rect(470, 580, 90, 40)
+    dfs_btn_rect = pygame.Rect(50, 580, 62, 40)
+    bfs_btn_rect = pygame.Rect(120, 580, 62, 40)
+    astar_btn_rect = pygame.Rect(190, 580, 62, 40)
+    jps_btn_rect = pygame.Rect(260, 580, 62, 40)
+    dijkstra_btn_rect = pygame.Rect(330, 580, 62, 40)
+    reset_btn_rect = pygame.Rect(400, 580, 62, 40)
+    output_btn_rect = pygame.Rect(570, 580, 180, 40)
+    algorithm_btns = [(dfs_btn_rect, DFS), (bfs_btn_rect, BFS), (astar_btn_rect, a_star), (jps_btn_rect, jump_point_search),
+                      (dijkstra_btn_rect, dijkstra)]
+
+    # Seconds of each frame given to painting the progress of a running search
+    SEARCH_BUDGET = 0.008
+    # Seconds between the updates of the progress shown while a job runs
+    PROGRESS_PERIOD = 0.1
+    # The text shown while each kind of job runs, and when it is cancelled
+    PROGRESS_TEXT = dict(load="Loading... %.1f s", search="Expanded %s", replan="Replanning... %.1f s")
+    STOPPED_TEXT = dict(load="Loading cancelled", search="Search stopped", replan="Replanning stopped")
+
+    # F3 toggles the profiling HUD, drawn in the band above the maze and refreshed every HUD_PERIOD seconds
+    hud_rect = pygame.Rect(0, 0, WINDOW_WIDTH, 48)
+    HUD_PERIOD = 0.25
 
     # Initialize variables
-    current_event_dfs = None
-    current_event_bfs = None
-    current_event_reset = None
-    current_event_astar = None
     output = "Cost = 0"
     window1 = True
     path = None
-    animation = False
+    animation = None
+    animation_speed = 1
+    # Loading, searching and replanning run as jobs on a background thread; job is the running one
+    worker = Worker(PROFILER)
+    job = None
+    expanded = 0
+    # Search events received but not painted yet
+    search_events = deque()
+    progress_drawn = 0
+    search_algorithm = None
+    planner = None
+    components = None
+    # Incremented whenever a replan may have toggled a cell, so the renderer rebuilds the maze bitmap
+    maze_version = 0
+    solve_cache = SolveCache()
+    renderer = MazeRenderer(WINDOW_WIDTH, WINDOW_HEIGHT)
+    redraw = True
+    view_changed = False
+    hud = False
+    hud_font = pygame.font.SysFont(FONT2, 13)
+    hud_drawn = 0
 
     while True:
+        frame_start = time.perf_counter()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if args.profile:
+                    print("Profile written to " + ", ".join(PROFILER.write(args.profile)))
                 pygame.quit()
                 sys.exit()
 
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                hud = not hud
+                if hud:
+                    PROFILER.enable()
+                elif not args.profile:
+                    PROFILER.disable()
+                redraw = True
+
             if event.type == pygame.MOUSEBUTTONDOWN:
+                redraw = True
                 mouse_pos = pygame.mouse.get_pos()
-                if window1 and upload_btn_rect1.collidepoint(mouse_pos):
+                if window1 and job is None and upload_btn_rect1.collidepoint(mouse_pos):
                     file_path = upload_excel_file()
                     if file_path:
-                        maze, start, goal = read_maze(file_path)
-                        window1 = False
+                        job = worker.submit("load", load_job, file_path)
+
+            # The mouse wheel zooms around the pointer, dragging with the right button pans, HOME shows the whole maze
+            if not window1 and event.type == pygame.MOUSEWHEEL:
+                renderer.zoom(event.y, pygame.mouse.get_pos())
+                view_changed = True
+            if not window1 and event.type == pygame.MOUSEMOTION and event.buttons[2]:
+                renderer.pan(*event.rel)
+                view_changed = True
+            if not window1 and event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+                renderer.reset_view()
+                view_changed = True
+
+            # ESC cancels the running load, search or replan
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE and job is not None:
+                job.cancel()
+                output = STOPPED_TEXT[job.kind]
+                if job.kind == "replan":
+                    # The worker may have toggled the cell already
+                    maze_version += 1
+                    solve_cache.clear()
+                job = None
+                redraw = True
+
+            # Animation controls: UP/+ faster, DOWN/- slower, SPACE/ENTER skip to the end
+            if event.type == pygame.KEYDOWN and animation is not None:
+                if event.key in (pygame.K_UP, pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    animation.faster()
+                    animation_speed = animation.cells_per_frame
+                elif event.key in (pygame.K_DOWN, pygame.K_MINUS, pygame.K_KP_MINUS):
+                    animation.slower()
+                    animation_speed = animation.cells_per_frame
+                elif event.key in (pygame.K_SPACE, pygame.K_RETURN):
+                    pygame.display.update(animation.skip(screen))
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if dfs_btn_rect.collidepoint(event.pos):
+                for btn_rect, algorithm in algorithm_btns:
+                    if not window1 and btn_rect.collidepoint(event.pos):
+                        if job is not None:
+                            job.cancel()
+                            if job.kind == "replan":
+                                maze_version += 1
+                                solve_cache.clear()
+                            job = None
+                        renderer.clear_overlay()
+                        animation = None
+                        result = solve_cache.lookup(algorithm, maze, start, goal)
+                        if result is None:
+                            # Explore on the worker thread, painting its progress from the frame loop
+                            job = worker.submit("search", search_job, algorithm, maze, start, goal)
+                            search_algorithm = algorithm
+                            expanded = 0
+                            search_events.clear()
+                            progress_drawn = 0
+                        else:
+                            path, cost = result
+                            output = "No Path Found" if path is None else "Cost = " + str(cost)
+                            animation = PathAnimation(renderer, path, start, goal, animation_speed) if path else None
+
+                # Clicking a cell of the maze toggles it between road and block and replans
+                cell = None if window1 or job is not None else renderer.cell_at(event.pos, maze)
+                if cell is not None and cell not in (start, goal):
+                    job = worker.submit("replan", replan_job, planner, components, cell)
+                    progress_drawn = 0
+
+                if not window1 and reset_btn_rect.collidepoint(event.pos):
+                    if job is not None:
+                        job.cancel()
+                        if job.kind == "replan":
+                            maze_version += 1
+                            solve_cache.clear()
+                        job = None
                     output = "Cost = 0"
-                    current_event_dfs = event.pos
-                    current_event_reset = None
-                    current_event_bfs = None
-                    current_event_astar = None
-                    animation = True
-
-                if reset_btn_rect.collidepoint(event.pos):
-                    output = "Cost = 0"
-                    current_event_reset = event.pos
-                    current_event_dfs = None
-                    current_event_bfs = None
-                    current_event_astar = None
-
-                if bfs_btn_rect.collidepoint(event.pos):
-                    output = "Cost = 0"
-                    current_event_bfs = event.pos
-                    current_event_dfs = None
-                    current_event_reset = None
-                    current_event_astar = None
-                    animation = True
-
-                if astar_btn_rect.collidepoint(event.pos):
-                    output = "Cost = 0"
-                    current_event_astar = event.pos
-                    current_event_bfs = None
-                    current_event_dfs = None
-                    current_event_reset = None
-                    animation = True
-
-                if upload_btn_rect2.collidepoint(event.pos):
+                    path = None
+                    animation = None
+                    renderer.clear_overlay()
+                    solve_cache.clear()
+
+                if not window1 and upload_btn_rect2.collidepoint(event.pos):
+                    if job is not None:
+                        job.cancel()
+                        if job.kind == "replan":
+                            maze_version += 1
+                            solve_cache.clear()
+                        job = None
                     output = "Cost = 0"
-                    current_event_astar = None
-                    current_event_bfs = None
-                    current_event_dfs = None
-                    current_event_reset = None
 
                     file_path = upload_excel_file()
                     if file_path:
-                        maze, start, goal = read_maze(file_path)
-
-        make_gradient_background(screen, PURPLE, PINK, WINDOW_WIDTH, WINDOW_HEIGHT)
-        create_text(screen, (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 1.02), FOOTER, 15, FONT2, WHITE)
-
-        if not window1:
-            create_text(screen, (WINDOW_WIDTH - 240, WINDOW_HEIGHT - 99), output, 20, FONT1, BLACK, output_btn_rect, WHITE)
-            draw_maze(screen, WINDOW_WIDTH, WINDOW_HEIGHT, maze, start, goal, animation)
-            create_btn(screen, dfs_btn_rect, RED, "RUN DFS", 16, FONT1, WHITE)
-            create_btn(screen, bfs_btn_rect, BLUE, "RUN BFS", 16, FONT1, WHITE)
-            create_btn(screen, astar_btn_rect, ORANGE, "RUN A*", 16, FONT1, WHITE)
-            create_btn(screen, reset_btn_rect, GRAY, "Reset", 20, FONT1, WHITE)
-            create_btn(screen, upload_btn_rect2, YELLOW, "Upload maze", 16, FONT1, WHITE)
-
-            if current_event_dfs:
-                path, cost = DFS(maze, start, goal)
-                if path is None:
-                    output = "No Path Found"
-                else:
-                    draw_maze(screen, WINDOW_WIDTH, WINDOW_HEIGHT, maze, start, goal, animation, path)
-                    output = "Cost = " + str(cost)
-                    animation = False
+                        job = worker.submit("load", load_job, file_path)
+                        progress_drawn = 0
+
+        # Idle frames leave the screen untouched; it is only redrawn after a click
+        if redraw:
+            with PROFILER.timer("background"):
+                renderer.make_gradient_background(screen, PURPLE, PINK)
+
+            if not window1:
+                with PROFILER.timer("maze"):
+                    renderer.draw_maze(screen, maze, start, goal, animation.shown() if animation else None, maze_version)
+
+            with PROFILER.timer("widgets"):
+                if not window1:
+                    create_text(screen, (WINDOW_WIDTH - 240, WINDOW_HEIGHT - 99), output, 20, FONT1, BLACK, output_btn_rect, WHITE)
+                    create_btn(screen, dfs_btn_rect, RED, "RUN DFS", 16, FONT1, WHITE)
+                    create_btn(screen, bfs_btn_rect, BLUE, "RUN BFS", 16, FONT1, WHITE)
+                    create_btn(screen, astar_btn_rect, ORANGE, "RUN A*", 16, FONT1, WHITE)
+                    create_btn(screen, jps_btn_rect, GREEN, "RUN JPS", 16, FONT1, WHITE)
+                    create_btn(screen, dijkstra_btn_rect, TEAL, "DIJKSTRA", 14, FONT1, WHITE)
+                    create_btn(screen, reset_btn_rect, GRAY, "Reset", 20, FONT1, WHITE)
+                    create_btn(screen, upload_btn_rect2, YELLOW, "Upload maze", 15, FONT1, WHITE)
 
-            if current_event_reset:
-                draw_maze(screen, WINDOW_WIDTH, WINDOW_HEIGHT, maze, start, goal, animation)
-
-            if current_event_bfs:
-                path, cost = BFS(maze, start, goal)
-                if path is None:
-                    output = "No Path Found"
-                else:
-                    draw_maze(screen, WINDOW_WIDTH, WINDOW_HEIGHT, maze, start, goal, animation, path)
-                    output = "Cost = " + str(cost)
-                    animation = False
-
-            if current_event_astar:
-                path, cost = a_star(maze, start, goal)
-                if path is None:
-                    output = "No Path Found"
                 else:
-                    draw_maze(screen, WINDOW_WIDTH, WINDOW_HEIGHT, maze, start, goal, animation, path)
-                    output = "Cost = " + str(cost)
-                    animation = False
-
-        else:
-            create_text(screen, (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 3.5), INTRO_TEXT, 25, FONT3, WHITE)
-            create_btn(screen, upload_btn_rect1, YELLOW, "Upload the maze", 22, FONT1, WHITE)
-
-        pygame.display.flip()
+                    create_text(screen, (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 3.5), INTRO_TEXT, 25, FONT3, WHITE)
+                    create_btn(screen, upload_btn_rect1, YELLOW, "Upload the maze", 22, FONT1, WHITE)
+                    if job is not None or output != "Cost = 0":
+                        create_text(screen, (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 1.5), output, 20, FONT1, WHITE)
+
+                create_text(screen, (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 1.02), FOOTER, 15, FONT2, WHITE)
+
+            if hud:
+                draw_hud(screen, hud_rect, hud_lines(PROFILER, search_algorithm and search_algorithm.__name__), hud_font)
+                hud_drawn = time.perf_counter()
+            with PROFILER.timer("flip"):
+                pygame.display.flip()
+            redraw = False
+
+        # Panning and zooming only redraw the maze view
+        elif view_changed and not window1:
+            with PROFILER.timer("maze"):
+                pygame.display.update(renderer.draw_maze(screen, maze, start, goal, animation.shown() if animation else None,
+                                                         maze_version))
+        view_changed = False
+
+        # Take the messages of the running job. Search progress is painted for at most SEARCH_BUDGET
+        # per frame; the search does not wait for it, so once its result is in, the events still
+        # waiting are only recorded in the overlay, which the redraw shows at once
+        if job is not None:
+            deadline = time.perf_counter() + SEARCH_BUDGET
+            rects = []
+            for message_job, kind, data in worker.poll():
+                if message_job is not job:
+                    continue
+                if kind == PROGRESS:
+                    search_events.extend(data)
+                    if data and data[-1][0] == PATH_FOUND:
+                        break
+                elif kind == DONE:
+                    if job.kind == "load":
+                        maze, start, goal, planner, components = data
+                        solve_cache.clear()
+                        path = None
+                        animation = None
+                        output = "Cost = 0"
+                        window1 = False
+                    elif job.kind == "replan":
+                        path, cost = data
+                        maze_version += 1
+                        renderer.clear_overlay()
+                        output = "No Path Found" if path is None else "Cost = " + str(cost)
+                        animation = PathAnimation(renderer, path, start, goal, animation_speed) if path else None
+                        if animation is not None:
+                            animation.skip(screen)
+                    job = None
+                    redraw = True
+                    break
+                elif kind == FAILED:
+                    output = "Loading failed" if job.kind == "load" else "Error: " + type(data).__name__
+                    print("%s failed: %r" % (job.kind.capitalize(), data), file=sys.stderr)
+                    job = None
+                    maze_version += 1
+                    redraw = True
+                    break
+                if time.perf_counter() > deadline:
+                    break
+
+            finished = bool(search_events) and search_events[-1][0] == PATH_FOUND
+            # Events left by a cancelled search are dropped when the next one starts
+            while job is not None and job.kind == "search" and search_events and (finished or time.perf_counter() < deadline):
+                event_kind, cells = search_events.popleft()
+                if event_kind == EXPANDED:
+                    expanded += len(cells)
+                    if finished:
+                        renderer.record_cells(cells, EXPANDED_COLOR)
+                    else:
+                        rects += renderer.draw_cells(screen, cells, EXPANDED_COLOR, start, goal, persist=True)
+                elif event_kind == FRONTIER:
+                    if finished:
+                        renderer.record_cells(cells, FRONTIER_COLOR)
+                    else:
+                        rects += renderer.draw_cells(screen, cells, FRONTIER_COLOR, start, goal, persist=True)
+                elif event_kind == PATH_FOUND:
+                    path, cost = cells
+                    solve_cache.store(cells, search_algorithm, maze, start, goal)
+                    output = "No Path Found" if path is None else "Cost = " + str(cost)
+                    animation = PathAnimation(renderer, path, start, goal, animation_speed) if path else None
+                    # The search is over; its DONE message carries nothing more
+                    job = None
+                    redraw = True
+            pygame.display.update(rects)
+
+        # Show the progress of the running job
+        if job is not None and time.perf_counter() - progress_drawn > PROGRESS_PERIOD:
+            if job.kind == "search":
+                output = PROGRESS_TEXT["search"] % format(expanded, ",")
+            else:
+                output = PROGRESS_TEXT[job.kind] % (time.perf_counter() - job.started)
+            if window1:
+                redraw = True
+            else:
+                create_text(screen, (WINDOW_WIDTH - 240, WINDOW_HEIGHT - 99), output, 20, FONT1, BLACK, output_btn_rect, WHITE)
+                pygame.display.update(output_btn_rect)
+            progress_drawn = time.perf_counter()
+
+        # Advance the path animation and push only the newly highlighted cells
+        if animation is not None and not animation.done:
+            with PROFILER.timer("animation"):
+                pygame.display.update(animation.step(screen))
+
+        if hud and time.perf_counter() - hud_drawn > HUD_PERIOD:
+            draw_hud(screen, hud_rect, hud_lines(PROFILER, search_algorithm and search_algorithm.__name__), hud_font)
+            pygame.display.update(hud_rect)
+            hud_drawn = time.perf_counter()
+
+        if PROFILER.enabled:
+            PROFILER.record("frame", frame_start, time.perf_counter() - frame_start)
         clock.tick(60)
 
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+import bisect
+import heapq
+import os
+import struct
+import sys
+import zlib
+from array import array
+from grid import as_grid
+from search import UNREACHED, path_cost
+#==============================================
+
+# Openings along a cluster border at least this wide get a transition at each end, others one in the middle
+WIDE_ENTRANCE = 6
+
+# Magic bytes and version of the files written by HPAStar.save
+MAGIC = b"HPA*"
+FORMAT_VERSION = 2
+
+# Header: magic, version, rows, cols, cluster size. It is followed by arrays of 32-bit little-endian
+# integers, each preceded by its length: the cluster checksums, the node count of each cluster,
+# the nodes of all clusters, their distance tables, and the borders as (cluster, neighbor, number
+# of pairs, pairs...) records.
+HEADER = struct.Struct("<4sHIII")
+LENGTH = struct.Struct("<I")
+
+# Translation table turning cells into the ASCII digits of a bitmask: "0" for blocks, "1" for roads
+_BITS = bytes([ord("0")] + [ord("1")] * 255)
+
+def _bit_search(roads, stride, source, targets, keep=False):
+    """
+    Breadth-first search over one cluster, one whole level at a time.
+
+    The roads of the cluster are the bits of one integer, so a level is expanded with four
+    shifts and a mask; the padding around the cluster keeps shifts from wrapping across rows.
+    :param roads: the roads of the padded cluster, as the bits of an integer
+    :param stride: the row stride of the padded cluster
+    :param source: the local index the search starts from
+    :param targets: the local indices to reach; the search stops once all of them are reached
+    :param keep: whether to keep the cells of every level, so paths can be traced with _trace()
+    :return: dict mapping every reached target to its distance, and the list of levels if keep
+    """
+    remaining = 0
+    for target in targets:
+        remaining |= 1 << target
+    found = {}
+    if remaining >> source & 1:
+        found[source] = 0
+        remaining ^= 1 << source
+    levels = []
+    frontier = 1 << source
+    unseen = roads & ~frontier
+    level = 0
+    while frontier and remaining:
+        if keep:
+            levels.append(frontier)
+        level += 1
+        frontier = (frontier << 1 | frontier >> 1 | frontier << stride | frontier >> stride) & unseen
+        unseen ^= frontier
+        hits = frontier & remaining
+        remaining ^= hits
+        while hits:
+            bit = hits & -hits
+            hits ^= bit
+            found[bit.bit_length() - 1] = level
+    return found, levels
+
+def _trace(levels, stride, target, distance):
+    """
+    Walks back from a target reached by _bit_search(keep=True) through the levels before it.
+    :return: list of the local indices of the path, from the source to the target
+    """
+    path = [target]
+    node = target
+    for level in range(distance - 1, -1, -1):
+        frontier = levels[level]
+        for offset in (1, -1, stride, -stride):
+            if frontier >> (node + offset) & 1:
+                node += offset
+                break
+        path.append(node)
+    return path[::-1]
+
+def _pair_distances(roads, stride, sources):
+    """
+    Distances between every two of the given local indices of a cluster. Distances are
+    symmetric, so the search from each source only has to reach the sources after it.
+    :return: array of len(sources) ** 2 distances, UNREACHED for sources that are apart
+    """
+    count = len(sources)
+    distances = array("i", [UNREACHED]) * (count * count)
+    position = {source: i for i, source in enumerate(sources)}
+    for i, source in enumerate(sources):
+        distances[i * count + i] = 0
+        found, _ = _bit_search(roads, stride, source, sources[i + 1:])
+        for node, distance in found.items():
+            j = position[node]
+            distances[i * count + j] = distances[j * count + i] = distance
+    return distances
+
+class HPAStar:
+    """
+    Hierarchical path-finding A* (HPA*) over a maze split into square clusters.
+
+    Wherever two neighboring clusters share an opening, transition cells are placed on both
+    sides, and the shortest distance between every two transitions of a cluster is computed
+    inside that cluster. A query connects the start and goal to the transitions of their
+    clusters, runs A* over this small abstract graph, and refines each abstract edge into
+    cells with a search confined to one cluster. Paths are near-optimal: they may be a little
+    longer than a_star's, as they only cross borders at transitions.
+
+    The abstraction can be saved to disk. It keeps a checksum of every cluster, so loading it
+    for an edited maze, or calling update() after edits, only rebuilds the clusters that
+    changed and the neighbors whose transitions moved.
+
+    Attributes:
+    - grid: The Grid being abstracted.
+    - cluster_size: The side of a cluster, in cells.
+    - cluster_rows: The number of rows of clusters.
+    - cluster_cols: The number of columns of clusters.
+    """
+
+    def __init__(self, maze, cluster_size=32, build=True):
+        """
+        Splits a maze into clusters and builds the abstract graph.
+
+        Parameters:
+        - maze: The maze grid representing the environment (a Grid or the legacy nested list).
+        - cluster_size: The side of a cluster, in cells.
+        - build: Whether to build the abstract graph now (load() fills it from a file instead).
+        """
+        self.grid = as_grid(maze)
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.grid.rows // cluster_size)
+        self.cluster_cols = -(-self.grid.cols // cluster_size)
+        count = self.cluster_rows * self.cluster_cols
+        # (cluster, cluster right of or below it) -> list of (node, node) transition pairs
+        self._borders = {}
+        # node -> nodes one step away in a neighboring cluster
+        self._links = {}
+        # Sorted transition nodes of every cluster, and their distance matrices (UNREACHED if apart)
+        self._nodes = [[] for _ in range(count)]
+        self._distances = [array("i") for _ in range(count)]
+        self._checksums = [None] * count
+        self._unpacked = None
+        if build:
+            self.rebuild(range(count))
+
+    @property
+    def _cells(self):
+        cells = self.grid.cells
+        if isinstance(cells, (bytes, bytearray)):
+            return cells
+        # Bit-packed grids (binmaze.PackedCells) are read-only, so they are unpacked only once
+        if self._unpacked is None:
+            self._unpacked = cells.tobytes()
+        return self._unpacked
+
+    def cluster_of(self, index):
+        """
+        :param index: the flat index of a cell
+        :return: the number of the cluster containing it
+        """
+        row, col = divmod(index, self.grid.stride)
+        return (row - 1) // self.cluster_size * self.cluster_cols + (col - 1) // self.cluster_size
+
+    def _bounds(self, cluster):
+        row, col = divmod(cluster, self.cluster_cols)
+        top, left = row * self.cluster_size, col * self.cluster_size
+        return top, left, min(top + self.cluster_size, self.grid.rows), min(left + self.cluster_size, self.grid.cols)
+
+    def _local(self, cluster):
+        """
+        Copies the roads of a cluster into the bits of an integer, padded with blocks.
+        :return: the roads, their row stride, and functions converting flat indices to and from local ones
+        """
+        top, left, bottom, right = self._bounds(cluster)
+        cells, stride = self._cells, self.grid.stride
+        width = right - left
+        local_stride = width + 2
+        local = bytearray(local_stride * (bottom - top + 2))
+        for row in range(top, bottom):
+            begin = (row + 1) * stride + left + 1
+            local_begin = (row - top + 1) * local_stride + 1
+            local[local_begin:local_begin + width] = cells[begin:begin + width]
+        # Bit i of the integer is local cell i, so the digits are written from the last cell
+        roads = int(local.translate(_BITS)[::-1], 2)
+
+        def to_local(index):
+            row, col = divmod(index, stride)
+            return (row - top) * local_stride + col - left
+
+        def to_global(index):
+            row, col = divmod(index, local_stride)
+            return (row + top) * stride + col + left
+
+        return roads, local_stride, to_local, to_global
+
+    def _checksum(self, cluster):
+        top, left, bottom, right = self._bounds(cluster)
+        cells, stride = self._cells, self.grid.stride
+        checksum = 0
+        for row in range(top, bottom):
+            begin = (row + 1) * stride + left + 1
+            checksum = zlib.crc32(cells[begin:begin + right - left], checksum)
+        return checksum
+
+    def _border_keys(self, cluster):
+        """
+        :return: the keys of the (up to four) borders of a cluster in _borders
+        """
+        row, col = divmod(cluster, self.cluster_cols)
+        keys = []
+        if col > 0:
+            keys.append((cluster - 1, cluster))
+        if row > 0:
+            keys.append((cluster - self.cluster_cols, cluster))
+        if col < self.cluster_cols - 1:
+            keys.append((cluster, cluster + 1))
+        if row < self.cluster_rows - 1:
+            keys.append((cluster, cluster + self.cluster_cols))
+        return keys
+
+    def _entrances(self, cluster, neighbor):
+        """
+        Places the transitions across the border between a cluster and the one right of or below it.
+        :return: list of (node, node) pairs, the first node of each pair inside cluster
+        """
+        top, left, bottom, right = self._bounds(cluster)
+        cells, stride = self._cells, self.grid.stride
+        # With a single column of clusters the one below is also cluster + 1, so test for it first
+        if neighbor == cluster + self.cluster_cols:
+            step = stride
+            border = range(bottom * stride + left + 1, bottom * stride + right + 1)
+        else:
+            step = 1
+            border = range((top + 1) * stride + right, (bottom + 1) * stride + right, stride)
+
+        pairs = []
+        run = []
+        for index in list(border) + [None]:
+            if index is not None and cells[index] and cells[index + step]:
+                run.append(index)
+                continue
+            if len(run) >= WIDE_ENTRANCE:
+                pairs += [(run[0], run[0] + step), (run[-1], run[-1] + step)]
+            elif run:
+                middle = run[len(run) // 2]
+                pairs.append((middle, middle + step))
+            run = []
+        return pairs
+
+    def _intra(self, cluster, nodes):
+        """
+        Computes the distances between every two transitions of a cluster, inside the cluster.
+        :return: array of len(nodes) ** 2 distances, UNREACHED for transitions that are apart
+        """
+        if not nodes:
+            return array("i")
+        roads, local_stride, to_local, _ = self._local(cluster)
+        return _pair_distances(roads, local_stride, [to_local(node) for node in nodes])
+
+    def _edges(self, node):
+        """
+        :return: list of the (node, cost) abstract edges of a transition: to the other transitions
+                 of its cluster it can reach, and one step across the border
+        """
+        cluster = self.cluster_of(node)
+        nodes = self._nodes[cluster]
+        count = len(nodes)
+        row = bisect.bisect_left(nodes, node) * count
+        edges = [edge for edge in zip(nodes, self._distances[cluster][row:row + count]) if edge[1] != UNREACHED]
+        return edges + [(other, 1) for other in self._links[node]]
+
+    def rebuild(self, clusters):
+        """
+        Recomputes the transitions around the given clusters, and the distances of every cluster
+        whose walls or transitions changed.
+        :param clusters: iterable of cluster numbers
+        :return: the set of clusters whose distances were recomputed
+        """
+        clusters = set(clusters)
+        changed = set(clusters)
+        done = set()
+        for cluster in clusters:
+            for key in self._border_keys(cluster):
+                if key in done:
+                    continue
+                done.add(key)
+                old, new = self._borders.get(key, []), self._entrances(*key)
+                if new == old:
+                    continue
+                for a, b in old:
+                    for node, other in ((a, b), (b, a)):
+                        self._links[node].remove(other)
+                        if not self._links[node]:
+                            del self._links[node]
+                for a, b in new:
+                    self._links.setdefault(a, []).append(b)
+                    self._links.setdefault(b, []).append(a)
+                self._borders[key] = new
+                changed.update(key)
+
+        for cluster in changed:
+            nodes = {node for key in self._border_keys(cluster) for pair in self._borders.get(key, ())
+                     for node in pair if self.cluster_of(node) == cluster}
+            self._nodes[cluster] = sorted(nodes)
+            self._distances[cluster] = self._intra(cluster, self._nodes[cluster])
+            self._checksums[cluster] = self._checksum(cluster)
+        return changed
+
+    def update(self, cells):
+        """
+        Brings the abstraction up to date after the given cells of the grid were edited.
+        :param cells: iterable of (row, column) tuples
+        :return: the set of clusters whose distances were recomputed
+        """
+        return self.rebuild({self.cluster_of(self.grid.index(cell)) for cell in cells})
+
+    def _search(self, index, targets):
+        """
+        Searches the cluster of a cell for the given cells of the same cluster.
+        :return: dict mapping every reached target to its distance, and a function returning
+                 the cells of a shortest path from index to a reached target
+        """
+        roads, local_stride, to_local, to_global = self._local(self.cluster_of(index))
+        found, levels = _bit_search(roads, local_stride, to_local(index), [to_local(node) for node in targets], True)
+
+        def path_to(target):
+            local = to_local(target)
+            return [to_global(node) for node in _trace(levels, local_stride, local, found[local])]
+
+        return {to_global(node): distance for node, distance in found.items()}, path_to
+
+    def query(self, start=None, goal=None, refine=True, stats=None):
+        """
+        Finds a path with near the fewest moves from the start position to the goal position. Terrain
+        weights do not steer the path, but the weighted cost of a refined path is reported.
+
+        :param start: The starting position in the maze (defaults to the grid's start).
+        :param goal: The target position to reach in the maze (defaults to the grid's goal).
+        :param refine: Whether to turn the abstract path into cells; without it the path only
+                       holds the start, the transitions crossed and the goal, and the cost is its number
+                       of moves (which is its cost on a maze without terrain weights).
+        :param stats: Optional dict that receives the number of abstract nodes "expanded".
+        :return: A tuple containing the path from start to end and its cost.
+        """
+        grid = self.grid
+        start, goal = start or grid.start, goal or grid.goal
+        start_index, goal_index = grid.index(start), grid.index(goal)
+        cells = self._cells
+        if not cells[start_index] or not cells[goal_index]:
+            return None, 0
+
+        start_cluster, goal_cluster = self.cluster_of(start_index), self.cluster_of(goal_index)
+        same_cluster = start_cluster == goal_cluster
+        start_costs, start_path = self._search(start_index, self._nodes[start_cluster] + [goal_index] * same_cluster)
+        goal_costs, goal_path = self._search(goal_index, self._nodes[goal_cluster])
+
+        stride, links = grid.stride, self._links
+        goal_row, goal_col = divmod(goal_index, stride)
+        start_edges = list(start_costs.items()) + (self._edges(start_index) if start_index in links else [])
+        if same_cluster and goal_index in start_costs:
+            start_edges.append((goal_index, start_costs[goal_index]))
+
+        g_score = {start_index: 0}
+        parent = {}
+        # Ties on f go to the deeper node, which keeps A* from widening across open areas
+        queue = [(0, 0, start_index)]
+        expanded = 0
+        while queue:
+            _, g_cost, current = heapq.heappop(queue)
+            g_cost = -g_cost
+            if g_cost > g_score[current]:
+                continue
+            expanded += 1
+            if current == goal_index:
+                break
+            edges = start_edges if current == start_index else self._edges(current)
+            if current in goal_costs:
+                edges = edges + [(goal_index, goal_costs[current])]
+            for node, cost in edges:
+                cost += g_cost
+                if cost < g_score.get(node, UNREACHED):
+                    g_score[node] = cost
+                    parent[node] = current
+                    row, col = divmod(node, stride)
+                    heapq.heappush(queue, (cost + abs(row - goal_row) + abs(col - goal_col), -cost, node))
+
+        if stats is not None:
+            stats["expanded"] = expanded
+        if goal_index not in g_score:
+            return None, 0
+
+        abstract = [goal_index]
+        while abstract[-1] != start_index:
+            abstract.append(parent[abstract[-1]])
+        abstract.reverse()
+        if not refine:
+            return [grid.cell(index) for index in abstract], g_score[goal_index]
+
+        path = [start_index]
+        for a, b in zip(abstract, abstract[1:]):
+            if b in self._links.get(a, ()):
+                path.append(b)
+            elif a == start_index:
+                path += start_path(b)[1:]
+            elif b == goal_index:
+                path += goal_path(a)[-2::-1]
+            else:
+                _, path_to = self._search(a, [b])
+                path += path_to(b)[1:]
+        path = [grid.cell(index) for index in path]
+        return path, path_cost(grid, path)
+
+    def save(self, file_path):
+        """
+        Writes the abstraction to a file, atomically replacing any existing one.
+        :param file_path: the path of the file to write
+        """
+        borders = array("i")
+        for (cluster, neighbor), pairs in self._borders.items():
+            borders.extend((cluster, neighbor, len(pairs)))
+            for pair in pairs:
+                borders.extend(pair)
+        sections = (array("I", self._checksums), array("i", map(len, self._nodes)),
+                    array("i", [node for nodes in self._nodes for node in nodes]),
+                    array("i", [distance for distances in self._distances for distance in distances]), borders)
+
+        temp_path = "%s.%d.tmp" % (file_path, os.getpid())
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.grid.rows, self.grid.cols, self.cluster_size))
+            for values in sections:
+                if sys.byteorder == "big":
+                    values.byteswap()
+                file.write(LENGTH.pack(len(values)))
+                values.tofile(file)
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path, maze):
+        """
+        Reads an abstraction written by save() for the given maze, rebuilding the clusters whose
+        walls differ from the saved ones.
+
+        :param file_path: the path of the file written by save()
+        :param maze: The maze grid the abstraction was built for (possibly edited since).
+        :return: a tuple of the HPAStar and the set of clusters that were rebuilt
+        :raises ValueError: if the file is not a valid abstraction of the maze
+        """
+        grid = as_grid(maze)
+        with open(file_path, "rb") as file:
+            data = file.read()
+        magic, version, rows, cols, cluster_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or (rows, cols) != (grid.rows, grid.cols) or cluster_size < 1:
+            raise ValueError("%s is not an abstraction of a %dx%d maze" % (file_path, grid.rows, grid.cols))
+
+        sections = []
+        offset = HEADER.size
+        for typecode in "Iiiii":
+            (length,) = LENGTH.unpack_from(data, offset)
+            offset += LENGTH.size
+            values = array(typecode)
+            end = offset + length * values.itemsize
+            if end > len(data):
+                raise ValueError("%s is truncated" % file_path)
+            values.frombytes(data[offset:end])
+            if sys.byteorder == "big":
+                values.byteswap()
+            sections.append(values)
+            offset = end
+        checksums, counts, nodes, distances, borders = sections
+
+        hpa = cls(grid, cluster_size, build=False)
+        clusters = hpa.cluster_rows * hpa.cluster_cols
+        if len(checksums) != clusters or len(counts) != clusters or sum(counts) != len(nodes) \
+                or sum(count * count for count in counts) != len(distances):
+            raise ValueError("%s does not match its header" % file_path)
+        hpa._checksums = checksums.tolist()
+        hpa._nodes, hpa._distances = [], []
+        node_start = distance_start = 0
+        for count in counts:
+            hpa._nodes.append(nodes[node_start:node_start + count].tolist())
+            hpa._distances.append(distances[distance_start:distance_start + count * count])
+            node_start += count
+            distance_start += count * count
+
+        hpa._borders = {}
+        position = 0
+        while position < len(borders):
+            cluster, neighbor, count = borders[position:position + 3]
+            position += 3
+            pairs = hpa._borders[cluster, neighbor] = []
+            for a, b in zip(borders[position:position + 2 * count:2], borders[position + 1:position + 2 * count:2]):
+                pairs.append((a, b))
+                hpa._links.setdefault(a, []).append(b)
+                hpa._links.setdefault(b, []).append(a)
+            position += 2 * count
+        stale = [cluster for cluster, checksum in enumerate(hpa._checksums) if checksum != hpa._checksum(cluster)]
+        return hpa, hpa.rebuild(stale) if stale else set()
+
+def load_or_build(maze, file_path, cluster_size=32):
+    """
+    Loads the abstraction saved at file_path, or builds it, and saves it if anything was (re)built.
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param file_path: the path of the abstraction file
+    :param cluster_size: The side of a cluster, in cells, when building from scratch.
+    :return: the HPAStar
+    """
+    try:
+        hpa, rebuilt = HPAStar.load(file_path, maze)
+    except (OSError, ValueError, struct.error):
+        hpa, rebuilt = HPAStar(maze, cluster_size), True
+    if rebuilt:
+        try:
+            hpa.save(file_path)
+        except OSError:
+            pass  # A read-only location only costs the next load a rebuild
+    return hpa
@@ -0,0 +1,200 @@
+import os
+from grid import Grid, ROAD, WALL, MAX_WEIGHT
+#==============================================
+
+# Cells that are roads; anything else (1, blanks, other text) is a block
+ROAD_TOKENS = {"0", "0.0", "S", "G"}
+
+# Cell value of every token that is not a block: roads, and integers from 2 to MAX_WEIGHT,
+# which are terrain weights (the cost of entering the cell)
+TOKEN_CELLS = dict.fromkeys(ROAD_TOKENS, ROAD)
+TOKEN_CELLS.update((token % weight, weight) for weight in range(2, MAX_WEIGHT + 1) for token in ("%d", "%d.0"))
+
+# Translation tables turning one-character cells into cell values, for text mazes drawn
+# with characters (where "." and " " are roads as well) and for single-character CSV cells;
+# the digits 2 to 9 are terrain weights
+TEXT_CELLS = bytes(ROAD if chr(code) in "0SG. " else code - 48 if chr(code) in "23456789" else WALL
+                   for code in range(256))
+CSV_CELLS = bytes(ROAD if chr(code) in "0SG" else code - 48 if chr(code) in "23456789" else WALL
+                  for code in range(256))
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+# Version of the parsing rules, part of the key of the parse cache (binmaze.load_cached):
+# increment it whenever a change makes some file load differently
+LOADER_VERSION = 2
+
+def detect_format(file_path):
+    """
+    Guesses the format of a maze file from its extension, falling back to its first bytes.
+    :param file_path: the path of the maze file
+    :return: "excel", "npy", "binary", "csv" or "text"
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        return "excel"
+    if extension in (".npy", ".csv"):
+        return extension[1:]
+    if extension == ".maze":
+        return "binary"
+
+    with open(file_path, "rb") as file:
+        head = file.readline(4096)
+    if head.startswith(b"PK") or head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "excel"
+    if head.startswith(b"\x93NUMPY"):
+        return "npy"
+    if head.startswith(b"MAZE"):
+        return "binary"
+    return "csv" if b"," in head else "text"
+
+def load_maze(file_path, fmt=None):
+    """
+    Loads a maze from an Excel, CSV, text, .npy or binary .maze file.
+
+    Roads are 0, blocks are 1, integers from 2 to MAX_WEIGHT are terrain weights (roads that
+    cost as much to enter), "S" marks the start and "G" the goal; any other value is a block as
+    well. Text files hold one row per line, either as whitespace-separated cells or
+    one character per cell, where "." and " " are roads too and e.g. "#" is a block.
+
+    :param file_path: the path of the maze file
+    :param fmt: "excel", "csv", "text", "npy" or "binary", detected from the file if None
+    :return: a tuple containing the maze Grid, start position, and goal position
+    :raises ValueError: if the format is unknown or the file holds no maze
+    """
+    fmt = fmt or detect_format(file_path)
+    if fmt == "excel":
+        grid = load_excel(file_path)
+    elif fmt == "npy":
+        grid = load_npy(file_path)
+    elif fmt == "binary":
+        from binmaze import load_binary
+        grid = load_binary(file_path)[0]
+    elif fmt in ("csv", "text"):
+        with open(file_path, encoding="utf-8-sig", newline="") as file:
+            grid = parse_rows(file, "," if fmt == "csv" else None)
+    else:
+        raise ValueError("Unknown maze format: %r" % fmt)
+    if not grid.rows or not grid.cols:
+        raise ValueError("%s holds no maze" % file_path)
+    return grid, grid.start, grid.goal
+
+def _row_cells(line, separator):
+    """
+    Converts one line of a CSV or text maze into its cell values.
+    :param separator: "," for CSV, None for whitespace-separated cells, "" for one character per cell
+    :return: a tuple of (bytes of cell values, column of "S" or -1, column of "G" or -1)
+    """
+    if separator == "":
+        chars, table = line, TEXT_CELLS
+    elif separator == "," and len(line) == 2 * line.count(",") + 1:
+        # Single-character cells: convert the whole row at once
+        chars, table = line[::2], CSV_CELLS
+    else:
+        tokens = [token.strip() for token in line.split(separator)]
+        row = bytes(TOKEN_CELLS.get(token, WALL) for token in tokens)
+        return row, tokens.index("S") if "S" in tokens else -1, tokens.index("G") if "G" in tokens else -1
+    return chars.encode("latin-1", "replace").translate(table), chars.find("S"), chars.find("G")
+
+def parse_rows(lines, separator=None):
+    """
+    Builds a grid from an iterable of lines, reading them one at a time so the source file
+    never has to fit in memory. Blank lines before and after the maze are ignored, and rows
+    shorter than the widest one are padded with blocks. In mazes of one character per cell, a
+    line of spaces is a row of roads, so only empty lines are blank there.
+
+    :param lines: iterable of text lines, e.g. an open file
+    :param separator: the cell separator ("," for CSV), None for text mazes
+    :return: the maze Grid
+    """
+    rows = []
+    start = goal = (0, 0)
+    blank_rows = 0
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not (line if separator == "" else line.strip(separator or None)):
+            blank_rows += 1 if rows else 0
+            continue
+        if separator is None and not rows:
+            # Text mazes are either whitespace-separated cells or one character per cell
+            tokens = line.split()
+            separator = None if len(tokens) > 1 and set(tokens) <= TOKEN_CELLS.keys() | {"1", "1.0"} else ""
+        # Blank lines inside the maze are rows of blocks
+        rows.extend(b"" for _ in range(blank_rows))
+        blank_rows = 0
+
+        row, start_col, goal_col = _row_cells(line, separator)
+        if start_col >= 0:
+            start = (len(rows), start_col)
+        if goal_col >= 0:
+            goal = (len(rows), goal_col)
+        rows.append(row)
+
+    cols = max(map(len, rows), default=0)
+    border = bytes(cols + 2)
+    cells = bytearray(border)
+    for row in rows:
+        cells += b"\0" + row.ljust(cols, b"\0") + b"\0"
+    cells += border
+    return Grid(len(rows), cols, cells, start, goal)
+
+def from_array(values):
+    """
+    Builds a grid from a 2D NumPy array in one vectorized pass.
+
+    Integer arrays hold 0 for roads, 2 to MAX_WEIGHT for terrain weights and anything else for
+    blocks, with the character codes of "S" (83) and "G" (71) marking the start and goal (so
+    these two weights cannot be used). Other arrays hold the same cells as a spreadsheet.
+
+    :param values: 2D NumPy array of cell values
+    :return: the maze Grid
+    """
+    import numpy as np
+
+    if values.dtype.kind in "iub":
+        is_start, is_goal = values == ord("S"), values == ord("G")
+        is_weight = (values >= 2) & (values <= MAX_WEIGHT) & ~is_start & ~is_goal
+        cell_values = np.where((values == 0) | is_start | is_goal, ROAD, np.where(is_weight, values, WALL))
+    else:
+        if values.dtype.kind == "S":
+            values = values.astype(str)
+        is_start, is_goal = values == "S", values == "G"
+        # Cells are matched as text, so 3, 3.0 and "3" are all the weight 3 and blanks (NaN) are blocks
+        cell_values = np.frompyfunc(lambda value: TOKEN_CELLS.get(str(value).strip(), WALL), 1, 1)(values)
+
+    rows, cols = values.shape
+    cells = bytearray((rows + 2) * (cols + 2))
+    # Write straight into the grid's buffer
+    np.frombuffer(cells, dtype=np.uint8).reshape(rows + 2, cols + 2)[1:-1, 1:-1] = cell_values
+    start = tuple(int(i) for i in np.argwhere(is_start)[-1]) if is_start.any() else (0, 0)
+    goal = tuple(int(i) for i in np.argwhere(is_goal)[-1]) if is_goal.any() else (0, 0)
+    return Grid(rows, cols, cells, start, goal)
+
+def load_excel(file_path):
+    """
+    Reads the first sheet of an Excel file, ignoring blank rows and columns around the maze.
+    :param file_path: the path to the Excel file containing the maze layout
+    :return: the maze Grid
+    """
+    import pandas as pd
+
+    df = pd.read_excel(file_path, header=None)
+    # Trim empty rows and columns around the maze (the sheets often start with a blank row)
+    filled = df.notna()
+    row_mask, col_mask = filled.any(axis=1).to_numpy(), filled.any(axis=0).to_numpy()
+    if not row_mask.any():
+        return Grid(0, 0)
+    rows, cols = row_mask.nonzero()[0], col_mask.nonzero()[0]
+    df = df.iloc[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    return from_array(df.to_numpy(dtype=object))
+
+def load_npy(file_path):
+    """
+    Memory-maps a .npy maze and converts it in one vectorized pass.
+    :param file_path: the path of the .npy file
+    :return: the maze Grid
+    """
+    import numpy as np
+
+    return from_array(np.load(file_path, mmap_mode="r", allow_pickle=False))
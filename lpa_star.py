@@ -0,0 +1,243 @@
+import heapq
+from array import array
+from grid import WALL, ROAD, as_grid
+from search import UNREACHED
+#==============================================
+
+# Expansions between the calls of the checkpoint given to LPAStar.plan()
+CHECKPOINT_INTERVAL = 4096
+# Share of the expansions of the last search from scratch that a repair may take before it is
+# abandoned for a new search from scratch (a repair expansion costs about four of the latter)
+REPAIR_LIMIT = 0.25
+
+class LPAStar:
+    """
+    Lifelong Planning A*: a shortest-path search that is repaired, not rerun, after wall edits.
+
+    Every cell keeps its g-value (its distance when last expanded) and its rhs-value (its best
+    neighbor's g-value plus its own terrain weight, the cost of entering it). Cells whose two
+    values disagree are queued by (f, h) keys, so ties on f go to the cell closest to the goal
+    as in search.a_star_steps (cells that got farther excepted, which are reopened first), and
+    plan() expands them until the goal is settled. After an edit
+    only the toggled cell and its neighbors are re-evaluated, so the next plan() only
+    re-expands the region whose distances changed and keeps the rest of the previous search.
+
+    An edit on the path can change the distances of most of the searched region, and repairing
+    them costs more than searching again. So a repair that expands more than REPAIR_LIMIT of
+    the cells of the last search from scratch is dropped for a new search from scratch, which
+    runs as a plain A* (no cell can have got farther yet).
+
+    Attributes:
+    - grid: The Grid being planned on. Its cells are edited in place, so it must not be bit-packed.
+    - start: Tuple (row, column) of the starting point.
+    - goal: Tuple (row, column) of the goal point.
+    """
+
+    def __init__(self, maze, start=None, goal=None):
+        """
+        Initializes the planner; the first call to plan() runs the complete search.
+
+        Parameters:
+        - maze: The maze grid representing the environment (a Grid or the legacy nested list).
+        - start: The starting position in the maze (defaults to the grid's start).
+        - goal: The target position to reach in the maze (defaults to the grid's goal).
+        """
+        self.grid = as_grid(maze, start, goal)
+        self.start, self.goal = start or self.grid.start, goal or self.grid.goal
+        self._start_index, self._goal_index = self.grid.index(self.start), self.grid.index(self.goal)
+        self._padded_goal = divmod(self._goal_index, self.grid.stride)
+        self._reset()
+
+    def _reset(self):
+        """
+        Drops the previous search, so the next plan() searches from scratch.
+        """
+        size = len(self.grid.cells)
+        self._g = array("i", [UNREACHED]) * size
+        self._rhs = array("i", [UNREACHED]) * size
+        self._queue = []
+        # True until the search from scratch settles the goal; _searched and _repaired count the
+        # expansions of the current search and repair over the plan() calls abandoned by a checkpoint
+        self._fresh = True
+        self._searched = self._repaired = 0
+        if self.grid.cells[self._start_index] != WALL:
+            self._rhs[self._start_index] = 0
+            self._push(self._start_index)
+
+    def _key(self, index):
+        g, rhs = self._g[index], self._rhs[index]
+        row, col = divmod(index, self.grid.stride)
+        h = abs(row - self._padded_goal[0]) + abs(col - self._padded_goal[1])
+        if g < rhs:
+            # Underconsistent cells go before every tie, smallest g first as in plain LPA*, so no
+            # outdated g-value is left on the path to the goal when the search stops
+            return g + h, g - UNREACHED
+        return rhs + h, h
+
+    def _push(self, index):
+        heapq.heappush(self._queue, self._key(index) + (index,))
+
+    def _update(self, index):
+        """
+        Recomputes the rhs-value of a cell and queues it if it became inconsistent.
+        Outdated queue entries are skipped when popped (lazy deletion).
+        """
+        if index != self._start_index:
+            best = UNREACHED
+            cells, g = self.grid.cells, self._g
+            if cells[index] != WALL:
+                # Blocks have no edges, even while their own g-value is still outdated
+                for offset in self.grid.offsets:
+                    if cells[index + offset] != WALL:
+                        best = min(best, g[index + offset])
+                best = min(best + cells[index], UNREACHED)
+            self._rhs[index] = best
+        if self._g[index] != self._rhs[index]:
+            self._push(index)
+
+    def _top(self):
+        """
+        Drops outdated entries from the top of the queue.
+        :return: the key of the first up-to-date entry, or None if the queue is empty
+        """
+        queue, g, rhs = self._queue, self._g, self._rhs
+        while queue:
+            *key, index = queue[0]
+            if g[index] != rhs[index] and tuple(key) == self._key(index):
+                return tuple(key)
+            heapq.heappop(queue)
+        return None
+
+    def plan(self, stats=None, checkpoint=None):
+        """
+        Brings the search up to date with the grid and returns the shortest path.
+        :param stats: Optional dict that receives the number of nodes "expanded" by this call.
+        :param checkpoint: Optional function called every CHECKPOINT_INTERVAL expansions; it may raise
+                           to abandon the call (e.g. worker.Job.checkpoint), and a later plan() resumes it.
+        :return: A tuple containing the shortest path from start to end and its cost.
+        """
+        count = 0 if self._fresh else self._repair(checkpoint)
+        if self._fresh:
+            count += self._search(checkpoint)
+        if stats is not None:
+            stats["expanded"] = count
+        return self.path()
+
+    def _search(self, checkpoint):
+        """
+        Searches from scratch: while no cell has got farther, LPA* is A* with rhs-values as the
+        tentative distances, run here without re-evaluating every neighbor of an expanded cell.
+        :return: the number of expanded nodes
+        """
+        g, rhs, cells, offsets, queue = self._g, self._rhs, self.grid.cells, self.grid.offsets, self._queue
+        stride, (goal_row, goal_col) = self.grid.stride, self._padded_goal
+        goal_index, searched = self._goal_index, self._searched
+        count = 0
+        while queue and g[goal_index] == UNREACHED:
+            f, h, index = queue[0]
+            if g[index] == rhs[index] or f - h != rhs[index]:
+                heapq.heappop(queue)  # settled already, or queued again since with a shorter distance
+                continue
+            if checkpoint is not None and not count % CHECKPOINT_INTERVAL:
+                self._searched = searched + count
+                checkpoint()
+            heapq.heappop(queue)
+            count += 1
+            g[index] = distance = rhs[index]
+            for offset in offsets:
+                node = index + offset
+                weight = cells[node]
+                if weight != WALL and distance + weight < rhs[node]:
+                    rhs[node] = distance + weight
+                    row, col = divmod(node, stride)
+                    h = abs(row - goal_row) + abs(col - goal_col)
+                    heapq.heappush(queue, (distance + weight + h, h, node))
+        self._fresh = False
+        self._searched = searched + count
+        return count
+
+    def _repair(self, checkpoint):
+        """
+        Re-expands the cells whose distances changed since the last plan(), unless that takes more
+        than REPAIR_LIMIT of the expansions of the last search from scratch; then the previous
+        search is dropped (see _reset) and the caller searches from scratch.
+        :return: the number of expanded nodes
+        """
+        g, rhs, cells, offsets = self._g, self._rhs, self.grid.cells, self.grid.offsets
+        goal_index, repaired = self._goal_index, self._repaired
+        budget = self._searched * REPAIR_LIMIT - repaired
+        count = 0
+        while True:
+            key = self._top()
+            if key is None or (key >= self._key(goal_index) and g[goal_index] == rhs[goal_index]):
+                break
+            if count > budget:
+                self._reset()
+                return count
+            if checkpoint is not None and not count % CHECKPOINT_INTERVAL:
+                self._repaired = repaired + count
+                checkpoint()
+            index = heapq.heappop(self._queue)[-1]
+            count += 1
+            if g[index] > rhs[index]:
+                # Overconsistent: the cell got closer, settle it
+                g[index] = rhs[index]
+            else:
+                # Underconsistent: the cell got farther, reopen it
+                g[index] = UNREACHED
+                self._update(index)
+            for offset in offsets:
+                if cells[index + offset] != WALL:
+                    self._update(index + offset)
+        self._repaired = 0
+        return count
+
+    def path(self):
+        """
+        Walks back from the goal along decreasing g-values.
+        :return: A tuple containing the path from start to end and its cost, (None, 0) if there is none.
+        """
+        g, cells, index = self._g, self.grid.cells, self._goal_index
+        if g[index] == UNREACHED or cells[index] == WALL:
+            return None, 0
+        cost, path = g[index], [index]
+        while index != self._start_index:
+            index = min((index + offset for offset in self.grid.offsets if cells[index + offset] != WALL),
+                        key=g.__getitem__)
+            path.append(index)
+        return [self.grid.cell(index) for index in reversed(path)], cost
+
+    def set_wall(self, cell, wall=True):
+        """
+        Makes a cell a block or a road and marks the affected cells for the next plan().
+        The start and goal cannot be edited.
+
+        :param cell: Tuple (row, column)
+        :param wall: True for a block, False for a road (of weight ROAD, whatever its weight before)
+        """
+        if cell in (self.start, self.goal):
+            raise ValueError("The start and goal cannot be walls")
+        index = self.grid.index(cell)
+        value = WALL if wall else ROAD
+        if self.grid.cells[index] == value:
+            return
+        self.grid.cells[index] = value
+        if self._fresh:
+            # The search from scratch was abandoned by a checkpoint: a settled cell may have got
+            # farther, which it cannot handle, so it restarts
+            self._reset()
+            return
+        self._update(index)
+        for offset in self.grid.offsets:
+            if self.grid.cells[index + offset] != WALL:
+                self._update(index + offset)
+
+    def toggle(self, cell):
+        """
+        Turns a block into a road or a road into a block (see set_wall).
+        :param cell: Tuple (row, column)
+        :return: True if the cell is now a block
+        """
+        wall = not self.grid.is_wall(cell)
+        self.set_wall(cell, wall)
+        return wall
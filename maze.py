@@ -0,0 +1,160 @@
+"""
+Headless maze solving.
+
+Usage: python -m maze solve PATH [PATH ...] [--algo bfs,dfs,astar] [--workers N] [--format jsonl|csv]
+
+Every maze file found in the given files and directories is solved with each algorithm in a
+pool of worker processes, and one result record per (maze, algorithm) is streamed to the
+output as soon as it is ready. Nothing here imports pygame or tkinter.
+"""
+import argparse
+import csv
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+#==============================================
+
+# Algorithm names accepted by --algo, mapped to "module:function"; modules are imported by the workers
+ALGORITHMS = {
+    "dfs": "search:DFS",
+    "bfs": "search:BFS",
+    "astar": "search:a_star",
+    "dijkstra": "search:dijkstra",
+    "jps": "search:jump_point_search",
+    "flood": "distance_field:flood_fill",
+}
+
+MAZE_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".csv", ".txt", ".npy", ".maze")
+
+FIELDS = ["file", "algorithm", "found", "path_length", "cost", "expanded", "seconds", "error"]
+
+def resolve(name):
+    """
+    Imports the search function registered under the given algorithm name.
+    :param name: a key of ALGORITHMS
+    :return: the search function
+    """
+    module, function = ALGORITHMS[name].split(":")
+    return getattr(importlib.import_module(module), function)
+
+def find_mazes(paths, recursive=False):
+    """
+    Lists the maze files among the given paths, expanding directories.
+    :param paths: iterable of file or directory paths
+    :param recursive: whether to descend into subdirectories
+    :return: sorted list of maze file paths
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for directory, subdirectories, names in os.walk(path):
+            files.extend(os.path.join(directory, name) for name in names if name.lower().endswith(MAZE_EXTENSIONS))
+            if not recursive:
+                subdirectories.clear()
+    return sorted(files)
+
+def solve_file(file_path, algorithms, cached=False):
+    """
+    Loads one maze and solves it with every requested algorithm.
+    :param file_path: the path of the maze file
+    :param algorithms: list of algorithm names (keys of ALGORITHMS)
+    :param cached: whether to load through the binary maze cache
+    :return: list of result records (dicts with the FIELDS keys)
+    """
+    try:
+        if cached:
+            from binmaze import load_cached
+            maze, start, goal = load_cached(file_path)
+        else:
+            from loaders import load_maze
+            maze, start, goal = load_maze(file_path)
+    except Exception as error:
+        return [dict(file=file_path, algorithm=name, error="%s: %s" % (type(error).__name__, error))
+                for name in algorithms]
+
+    records = []
+    for name in algorithms:
+        record = dict(file=file_path, algorithm=name)
+        stats = {}
+        try:
+            began = time.perf_counter()
+            path, cost = resolve(name)(maze, start, goal, stats=stats)
+            record["seconds"] = round(time.perf_counter() - began, 6)
+        except Exception as error:
+            record["error"] = "%s: %s" % (type(error).__name__, error)
+        else:
+            record.update(found=path is not None, path_length=len(path) if path else 0, cost=cost,
+                          expanded=stats.get("expanded"))
+        records.append(record)
+    return records
+
+def solve_all(files, algorithms, workers=None, cached=False):
+    """
+    Solves every file in a process pool, yielding result records as they complete.
+    :param files: list of maze file paths
+    :param algorithms: list of algorithm names (keys of ALGORITHMS)
+    :param workers: the number of worker processes (defaults to the CPU count), 1 to run inline
+    :param cached: whether to load through the binary maze cache
+    """
+    if workers == 1:
+        for file_path in files:
+            yield from solve_file(file_path, algorithms, cached)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_file, file_path, algorithms, cached) for file_path in files]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def write_records(records, output, fmt):
+    """
+    Streams result records to an open text file as JSON lines or CSV rows, flushing each one.
+    """
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+    for record in records:
+        if writer is None:
+            output.write(json.dumps(record) + "\n")
+        else:
+            writer.writerow(record)
+        output.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m maze", description="Headless maze solving.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    solve = commands.add_parser("solve", help="solve maze files in batch")
+    solve.add_argument("paths", nargs="+", help="maze files or directories of maze files")
+    solve.add_argument("--algo", default="bfs,dfs,astar",
+                       help="comma-separated algorithms among %s (default: bfs,dfs,astar)" % ", ".join(ALGORITHMS))
+    solve.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    solve.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="output format (default: jsonl)")
+    solve.add_argument("--output", "-o", help="output file (default: standard output)")
+    solve.add_argument("--recursive", "-r", action="store_true", help="also search subdirectories")
+    solve.add_argument("--cache", action="store_true", help="load mazes through the binary maze cache")
+    args = parser.parse_args(argv)
+
+    algorithms = [name.strip() for name in args.algo.split(",") if name.strip()]
+    unknown = [name for name in algorithms if name not in ALGORITHMS]
+    if unknown:
+        parser.error("unknown algorithm(s): %s" % ", ".join(unknown))
+    files = find_mazes(args.paths, args.recursive)
+    if not files:
+        parser.error("no maze files found")
+
+    records = solve_all(files, algorithms, args.workers, args.cache)
+    if args.output:
+        with open(args.output, "w", newline="") as output:
+            write_records(records, output, args.format)
+    else:
+        write_records(records, sys.stdout, args.format)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
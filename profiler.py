@@ -0,0 +1,243 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from search import EXPANDED, FRONTIER
+#==============================================
+
+# Since Python 3.12 cProfile runs on sys.monitoring: a profile sees every thread, and only one
+# can be enabled at a time, so threads are not given profiles of their own
+_PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+class _NullTimer:
+    """
+    The timer handed out while profiling is disabled: entering and leaving it does nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+class _ThreadProfile:
+    __slots__ = ("profile",)
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        return False
+
+class Profiler:
+    """
+    Low-overhead timers and counters around the hot paths of the program.
+
+    Code wraps a stage in `with profiler.timer("name"):`. While the profiler is disabled this
+    hands out one shared timer that does nothing, so instrumented code only pays for a method
+    call and an attribute check. While enabled, every stage keeps its call count, total, maximum
+    and last duration, and (when tracing) every call is also kept as a Chrome trace event, which
+    chrome://tracing or https://ui.perfetto.dev can display as a timeline.
+
+    Attributes:
+    - enabled: Whether timers and counters record anything.
+    - stats: dict mapping every stage name to [calls, total seconds, max seconds, last seconds].
+    - counters: dict mapping counter names to their last value.
+    - trace: list of Chrome trace events, or None when not tracing.
+    """
+
+    # Trace events kept at most, so that a long session cannot exhaust memory
+    MAX_TRACE_EVENTS = 200000
+
+    def __init__(self):
+        """
+        Initializes a disabled profiler.
+        """
+        self.enabled = False
+        self.stats = {}
+        self.counters = {}
+        self.trace = None
+        self._profile = None
+        self._thread_profiles = {}
+        self._origin = time.perf_counter()
+
+    def enable(self, trace=False, profile=False):
+        """
+        Starts recording.
+        :param trace: whether to keep every timed call as a trace event
+        :param profile: whether to also run cProfile over everything until write()
+        """
+        self.enabled = True
+        if trace and self.trace is None:
+            self.trace = []
+        if profile and self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def disable(self):
+        """
+        Stops recording; the statistics gathered so far are kept.
+        """
+        self.enabled = False
+
+    def profiling(self):
+        """
+        Before Python 3.12 cProfile only sees the thread it was enabled on, so code run on other
+        threads (e.g. the jobs of a worker.Worker) is wrapped in `with profiler.profiling():` to
+        be profiled as well. Every thread then keeps its own cProfile.Profile, and write() merges
+        them. From 3.12 on, the main profile already covers every thread.
+        :return: a context manager running cProfile on the current thread while whole-program
+                 profiling is on and per-thread profiles are needed, doing nothing otherwise
+        """
+        if self._profile is None or not _PROFILE_PER_THREAD:
+            return _NULL_TIMER
+        thread = threading.get_ident()
+        profile = self._thread_profiles.get(thread)
+        if profile is None:
+            profile = self._thread_profiles[thread] = cProfile.Profile()
+        return _ThreadProfile(profile)
+
+    def timer(self, name):
+        """
+        :param name: the name of the stage being timed
+        :return: a context manager timing the stage while the profiler is enabled
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def record(self, name, start, seconds):
+        """
+        Adds one timed call of a stage.
+        :param name: the name of the stage
+        :param start: the time.perf_counter() value when the call started
+        :param seconds: the duration of the call
+        """
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0.0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] = max(stat[2], seconds)
+        stat[3] = seconds
+        if self.trace is not None and len(self.trace) < self.MAX_TRACE_EVENTS:
+            self.trace.append(dict(name=name, ph="X", pid=os.getpid(), tid=0,
+                                   ts=round((start - self._origin) * 1e6, 1), dur=round(seconds * 1e6, 1)))
+
+    def count(self, name, value):
+        """
+        Sets a counter, if the profiler is enabled.
+        :param name: the name of the counter
+        :param value: its new value
+        """
+        if self.enabled:
+            self.counters[name] = value
+
+    def last(self, name):
+        """
+        :return: the duration of the last call of a stage in seconds, 0 if it never ran
+        """
+        stat = self.stats.get(name)
+        return stat[3] if stat else 0.0
+
+    def summary(self):
+        """
+        :return: dict mapping every stage name to its calls, total, mean and max milliseconds
+        """
+        return {name: dict(calls=calls, total_ms=round(total * 1000, 3), mean_ms=round(total * 1000 / calls, 3),
+                           max_ms=round(longest * 1000, 3))
+                for name, (calls, total, longest, _) in sorted(self.stats.items())}
+
+    def write(self, prefix):
+        """
+        Writes the cProfile dump (prefix.prof, if cProfile was running), merged across threads,
+        and the JSON trace with the summary and counters (prefix.json).
+        :param prefix: the path of the files to write, without extension
+        :return: list of the paths written
+        """
+        written = []
+        if self._profile is not None:
+            self._profile.disable()
+            stats = pstats.Stats(self._profile)
+            for profile in list(self._thread_profiles.values()):
+                stats.add(profile)
+            stats.dump_stats(prefix + ".prof")
+            written.append(prefix + ".prof")
+        with open(prefix + ".json", "w") as file:
+            json.dump(dict(traceEvents=self.trace or [], displayTimeUnit="ms",
+                           otherData=dict(summary=self.summary(), counters=self.counters)), file)
+        written.append(prefix + ".json")
+        return written
+
+def profiled_steps(profiler, name, steps):
+    """
+    Wraps a step-wise search (see search.py) to time it and count its work as it runs.
+
+    Every batch is timed as the stage "search", and once the search ends the counters
+    "<name>.expanded" (nodes expanded), "<name>.max_frontier" (the largest number of pushed but
+    not yet expanded nodes seen between batches), "<name>.allocated_blocks" (the most memory
+    blocks held beyond those held at the start, from sys.getallocatedblocks()) and
+    "<name>.seconds" are set.
+
+    :param profiler: the Profiler to record into
+    :param name: the name of the search, e.g. the algorithm
+    :param steps: a generator returned by dfs_steps, bfs_steps, a_star_steps or jps_steps
+    :return: a generator yielding the same batches
+    """
+    expanded = frontier = max_frontier = max_blocks = 0
+    blocks = sys.getallocatedblocks()
+    seconds = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                events = next(steps)
+            except StopIteration:
+                return
+            duration = time.perf_counter() - start
+            seconds += duration
+            profiler.record("search", start, duration)
+            for kind, data in events:
+                if kind == EXPANDED:
+                    expanded += len(data)
+                    frontier -= len(data)
+                elif kind == FRONTIER:
+                    frontier += len(data)
+            max_frontier = max(max_frontier, frontier)
+            max_blocks = max(max_blocks, sys.getallocatedblocks() - blocks)
+            yield events
+    finally:
+        steps.close()
+        profiler.count(name + ".expanded", expanded)
+        profiler.count(name + ".max_frontier", max_frontier)
+        profiler.count(name + ".allocated_blocks", max_blocks)
+        profiler.count(name + ".seconds", round(seconds, 6))
+
+# The profiler shared by the whole program
+PROFILER = Profiler()
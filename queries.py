@@ -0,0 +1,114 @@
+from array import array
+from collections import OrderedDict, deque
+from connectivity import ComponentIndex
+from grid import ROAD, WALL, as_grid
+from search import path_cost, reconstruct_path
+#==============================================
+
+class PathQueries:
+    """
+    Answers many path queries against one maze. Paths have the fewest moves; terrain weights do
+    not steer them, but their weighted cost is reported.
+
+    A ComponentIndex answers unreachable goals at once, without any search. Reachable ones
+    are read off a breadth-first tree: a complete breadth-first search from the start (or,
+    the maze being undirected, from the goal) whose parent array is kept in a
+    least-recently-used cache, so every further query from the same cell is a walk up the tree.
+
+    Attributes:
+    - grid: The Grid being queried.
+    - components: The ComponentIndex of the grid.
+    - max_trees: The maximum number of breadth-first trees kept before the oldest is evicted.
+    """
+
+    def __init__(self, maze, max_trees=8):
+        """
+        Indexes the components of the maze.
+
+        Parameters:
+        - maze: The maze grid representing the environment (a Grid or the legacy nested list).
+        - max_trees: The maximum number of breadth-first trees kept before the oldest is evicted.
+        """
+        self.grid = as_grid(maze)
+        self.components = ComponentIndex(self.grid)
+        self.max_trees = max_trees
+        self._trees = OrderedDict()
+
+    def _tree(self, source_index):
+        """
+        Returns the parent array of a breadth-first search from source_index over its whole component.
+        """
+        if source_index in self._trees:
+            self._trees.move_to_end(source_index)
+            return self._trees[source_index]
+
+        cells, offsets = self.grid.cells, self.grid.offsets
+        parent = array("i", [-1]) * len(cells)
+        parent[source_index] = source_index
+        queue = deque([source_index])
+        while queue:
+            current = queue.popleft()
+            for offset in offsets:
+                node = current + offset
+                if cells[node] and parent[node] < 0:
+                    parent[node] = current
+                    queue.append(node)
+
+        self._trees[source_index] = parent
+        if len(self._trees) > self.max_trees:
+            self._trees.popitem(last=False)
+        return parent
+
+    def query(self, start, goal, stats=None):
+        """
+        Finds a path with the fewest moves from the start position to the goal position.
+        :param start: The starting position in the maze.
+        :param goal: The target position to reach in the maze.
+        :param stats: Optional dict that receives "reachable" and whether a cached tree was used ("cached").
+        :return: A tuple containing the path from start to end and its weighted cost.
+        """
+        reachable = self.components.connected(start, goal)
+        if stats is not None:
+            stats["reachable"] = reachable
+        if not reachable:
+            return None, 0
+
+        start_index, goal_index = self.grid.index(start), self.grid.index(goal)
+        reverse = start_index not in self._trees and goal_index in self._trees
+        if stats is not None:
+            stats["cached"] = start_index in self._trees or reverse
+        if reverse:
+            # The path runs backwards, so its cost counts the start's weight instead of the goal's
+            path = reconstruct_path(self.grid, self._tree(goal_index), start_index)[0][::-1]
+            return path, path_cost(self.grid, path)
+        return reconstruct_path(self.grid, self._tree(start_index), goal_index)
+
+    def query_many(self, pairs):
+        """
+        Answers a batch of queries, grouping them by start so every tree is built only once.
+        :param pairs: iterable of (start, goal) tuples
+        :return: list of (path, cost) tuples, in the order of the pairs
+        """
+        pairs = list(pairs)
+        order = sorted(range(len(pairs)), key=lambda i: pairs[i][0])
+        results = [None] * len(pairs)
+        for i in order:
+            results[i] = self.query(*pairs[i])
+        return results
+
+    def set_wall(self, cell, wall=True):
+        """
+        Makes a cell a block or a road, updating the component index.
+        Only the cached trees of the components around the cell are dropped.
+
+        :param cell: Tuple (row, column)
+        :param wall: True for a block, False for a road
+        """
+        index = self.grid.index(cell)
+        labels = self.components.labels
+        # Decide before the update, which may give the parts of a split component new labels
+        affected = {labels[index + offset] for offset in (0,) + self.grid.offsets} - {0}
+        for source in [source for source in self._trees if labels[source] in affected or source == index]:
+            del self._trees[source]
+        self.grid.set_cell(cell, WALL if wall else ROAD)
+        self.components.update(cell)
@@ -0,0 +1,536 @@
+import math
+import pygame
+from grid import as_grid
+#==============================================
+
+WHITE = (255, 255, 255)
+ROAD_COLOR = (109, 79, 107)
+WALL_COLOR = (155, 93, 118)
+PATH_COLOR = (195, 197, 187)
+EXPANDED_COLOR = (84, 110, 156)
+FRONTIER_COLOR = (243, 202, 50)
+
+# Cells at least this many pixels wide and high are drawn separated by grid lines
+GRID_LINES_MIN = 4
+
+# The largest cell side, in pixels, the view zooms in to
+MAX_CELL_SIZE = 128
+
+# Palette of the maze bitmaps: 0 is a block, 255 a road, and the values between the share of
+# roads among the cells merged into one pixel when the maze is zoomed out
+MAZE_PALETTE = [tuple(wall + (road - wall) * value // 255 for wall, road in zip(WALL_COLOR, ROAD_COLOR))
+                for value in range(256)]
+
+# Translation table turning cells into maze bitmap values: terrain weights are drawn as
+# roads shaded towards the block color, the heavier the closer, halfway from weight 9 on
+_BITMAP_VALUES = bytes([0, 255] + [max(128, 255 - 16 * (weight - 1)) for weight in range(2, 256)])
+
+class MazeRenderer:
+    """
+    Draws the part of the maze inside a pannable, zoomable view.
+
+    The maze is kept as a bitmap with one pixel per cell. A frame crops it to the visible cells
+    and scales it up, then draws grid lines only across those cells, so the cost depends on the
+    size of the view, not of the maze. When cells are smaller than a pixel, a downsampled
+    bitmap is blitted instead, in which every pixel shows the share of roads among the cells it
+    covers; these levels of detail are built with NumPy (pygame.surfarray) when it is installed.
+
+    Cells painted while a search explores the maze are recorded in an overlay, one byte per
+    cell, so redraws after panning or zooming still show them. The composed view is cached,
+    so a redraw that changes nothing costs a single blit.
+
+    Attributes:
+    - width: Width of the screen.
+    - height: Height of the screen.
+    - rect_x, rect_y: Position of the top-left corner of the maze view.
+    - area: pygame.Rect of the maze view.
+    - cell_width, cell_height: Size of a cell in pixels at the current zoom (below 1 when zoomed out).
+    - view_x, view_y: The (column, row) of the maze at the top-left corner of the view.
+    """
+
+    def __init__(self, width, height, rect_x=50, rect_y=50):
+        """
+        Initializes a renderer for a window of the given size.
+
+        Parameters:
+        - width: Width of the screen.
+        - height: Height of the screen.
+        - rect_x, rect_y: Position of the top-left corner of the maze view.
+        """
+        self.width = width
+        self.height = height
+        self.rect_x = rect_x
+        self.rect_y = rect_y
+        self.area = pygame.Rect(rect_x, rect_y, width - rect_x * 2, int(height - rect_y * 3.5))
+        self.cell_width = 0
+        self.cell_height = 0
+        self.view_x = self.view_y = 0.0
+        self._zoom = 0
+        self._fit = (0, 0)
+        self._shape = None
+        self._background = None
+        self._background_key = None
+        self._maze = None
+        self._maze_key = None
+        self._levels = {}
+        self._painted = None
+        self._palette = {}
+        self._painted_version = 0
+        self._path_layer = None
+        self._path = None
+        self._path_version = 0
+        self._view = None
+        self._view_key = None
+        self._icons = {}
+
+    def make_gradient_background(self, screen, color1, color2):
+        """
+        Blits a vertical gradient background, rendering it only the first time it is requested.
+
+        :param screen: Pygame screen surface to draw the gradient background on.
+        :param color1: Starting color of the gradient as a tuple (R, G, B).
+        :param color2: Ending color of the gradient as a tuple (R, G, B).
+        """
+        key = (color1, color2, self.width, self.height)
+        if self._background_key != key:
+            self._background = pygame.Surface((self.width, self.height))
+            for y in range(self.height):
+                # Interpolate colors between color1 and color2 based on the current height
+                r = int(color1[0] + (color2[0] - color1[0]) * (y / self.height))
+                g = int(color1[1] + (color2[1] - color1[1]) * (y / self.height))
+                b = int(color1[2] + (color2[2] - color1[2]) * (y / self.height))
+                pygame.draw.line(self._background, (r, g, b), (0, y), (self.width, y))
+            self._background_key = key
+        screen.blit(self._background, (0, 0))
+
+    def icon(self, file_path, size):
+        """
+        Loads an icon from disk and scales it, caching every (file, size) pair.
+        :param file_path: the path of the image file
+        :param size: the side length of the scaled icon in pixels
+        :return: the scaled icon Surface
+        """
+        key = (file_path, size)
+        if key not in self._icons:
+            if file_path not in self._icons:
+                self._icons[file_path] = pygame.image.load(file_path)
+            self._icons[key] = pygame.transform.scale(self._icons[file_path], (size, size))
+        return self._icons[key]
+
+    @property
+    def grid_lines(self):
+        return self.cell_width >= GRID_LINES_MIN and self.cell_height >= GRID_LINES_MIN
+
+    def _x(self, col):
+        return self.rect_x + math.floor((col - self.view_x) * self.cell_width)
+
+    def _y(self, row):
+        return self.rect_y + math.floor((row - self.view_y) * self.cell_height)
+
+    def cell_rect(self, cell):
+        """
+        Returns the screen rectangle filled for the given cell.
+        :param cell: Tuple (row, column)
+        :return: pygame.Rect inside the cell's grid lines (at least one pixel when zoomed out)
+        """
+        row, col = cell
+        x, y = self._x(col), self._y(row)
+        if self.grid_lines:
+            return pygame.Rect(x + 1, y + 1, self.cell_width - 1, self.cell_height - 1)
+        return pygame.Rect(x, y, max(1, self._x(col + 1) - x), max(1, self._y(row + 1) - y))
+
+    def cell_at(self, position, maze):
+        """
+        Returns the cell under a screen position, e.g. a mouse click.
+        :param position: (x, y) tuple in screen coordinates
+        :param maze: Grid (or legacy 2D list) representing the maze grid
+        :return: Tuple (row, column), or None if the position is outside the maze
+        """
+        if not self.cell_width or not self.cell_height or not self.area.collidepoint(position):
+            return None
+        grid = as_grid(maze)
+        row = math.floor(self.view_y + (position[1] - self.rect_y) / self.cell_height)
+        col = math.floor(self.view_x + (position[0] - self.rect_x) / self.cell_width)
+        if 0 <= row < grid.rows and 0 <= col < grid.cols:
+            return row, col
+        return None
+
+    def _fit_size(self, grid):
+        """
+        :return: the cell size showing the whole maze: whole pixels as large as fit, or, for a
+                 maze larger than the view, the largest power of two below one pixel that fits
+        """
+        width, height = self.area.size
+        if grid.cols <= width and grid.rows <= height:
+            return width // grid.cols, height // grid.rows
+        side = 2.0 ** -math.ceil(math.log2(max(grid.cols / width, grid.rows / height)))
+        return side, side
+
+    def _apply_zoom(self):
+        """
+        Sets the cell size for the zoom level, which doubles or halves the fitted size per step.
+        """
+        scale = 2.0 ** self._zoom
+        width, height = self._fit[0] * scale, self._fit[1] * scale
+        if min(width, height) >= 1:
+            self.cell_width, self.cell_height = int(width), int(height)
+        else:
+            self.cell_width = self.cell_height = 2.0 ** math.floor(math.log2(min(width, height)))
+
+    def _clamp_view(self):
+        rows, cols = self._shape
+        self.view_x = min(max(self.view_x, 0.0), max(0.0, cols - self.area.width / self.cell_width))
+        self.view_y = min(max(self.view_y, 0.0), max(0.0, rows - self.area.height / self.cell_height))
+
+    def reset_view(self):
+        """
+        Zooms out to show the whole maze.
+        """
+        self._zoom = 0
+        self.view_x = self.view_y = 0.0
+        if self._shape is not None:
+            self._apply_zoom()
+
+    def zoom(self, steps, position=None):
+        """
+        Zooms in (steps > 0) or out (steps < 0), each step doubling or halving the cells, keeping
+        the maze point under position in place. The view never zooms out beyond the whole maze.
+        :param steps: the number of zoom steps
+        :param position: (x, y) screen position to zoom around, the center of the view by default
+        """
+        if self._shape is None:
+            return
+        x, y = position if position is not None and self.area.collidepoint(position) else self.area.center
+        col = self.view_x + (x - self.rect_x) / self.cell_width
+        row = self.view_y + (y - self.rect_y) / self.cell_height
+        zoom = max(0, self._zoom + steps)
+        while zoom > self._zoom and max(self._fit) * 2.0 ** zoom > MAX_CELL_SIZE:
+            zoom -= 1
+        self._zoom = zoom
+        self._apply_zoom()
+        self.view_x = col - (x - self.rect_x) / self.cell_width
+        self.view_y = row - (y - self.rect_y) / self.cell_height
+        self._clamp_view()
+
+    def pan(self, dx, dy):
+        """
+        Moves the maze by a number of pixels, e.g. the relative motion of a mouse drag.
+        :param dx: pixels to the right
+        :param dy: pixels down
+        """
+        if self._shape is None:
+            return
+        self.view_x -= dx / self.cell_width
+        self.view_y -= dy / self.cell_height
+        self._clamp_view()
+
+    def _blit_icons(self, surface, cell, start, goal):
+        icon_size = int(min(self.cell_width, self.cell_height)) - 10
+        if icon_size <= 0 or cell not in (start, goal):
+            return
+        icon = self.icon('img/finish-flag2.png' if cell == start else 'img/target.png', icon_size)
+        surface.blit(icon, icon.get_rect(center=self.cell_rect(cell).center))
+
+    def _set_maze(self, grid):
+        """
+        Forgets the bitmaps of the previous maze, and resets the view if the maze size changed.
+        """
+        self._levels = {}
+        if self._shape != (grid.rows, grid.cols):
+            self._shape = (grid.rows, grid.cols)
+            self._fit = self._fit_size(grid)
+            self._painted = None
+            self.reset_view()
+        self._path = None
+        cells = grid.cells if isinstance(grid.cells, (bytes, bytearray)) else grid.cells.tobytes()
+        stride = grid.stride
+        self._levels[0] = b"".join(cells[(row + 1) * stride + 1:(row + 1) * stride + 1 + grid.cols]
+                                   for row in range(grid.rows)).translate(_BITMAP_VALUES)
+
+    def _level(self, level):
+        """
+        Returns the maze bitmap with one pixel per 2**level x 2**level cells, built on first use.
+        """
+        surface = self._levels.get(("surface", level))
+        if surface is not None:
+            return surface
+        rows, cols = self._shape
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        if level == 0:
+            surface = pygame.image.frombuffer(self._levels[0], (cols, rows), "P")
+        elif np is None:
+            # Without NumPy, pixels are sampled from the full bitmap instead of averaged
+            surface = pygame.transform.scale(self._level(0), (-(-cols >> level), -(-rows >> level)))
+        else:
+            if level - 1 not in self._levels:
+                self._level(level - 1)
+            values = self._levels[level - 1]
+            if not isinstance(values, np.ndarray):
+                values = np.frombuffer(values, dtype=np.uint8).reshape(rows, cols)
+            values = values.astype(np.uint16)
+            # Odd sizes repeat their last row or column, then every 2x2 block is averaged
+            values = np.pad(values, ((0, values.shape[0] % 2), (0, values.shape[1] % 2)), mode="edge")
+            values = ((values[0::2, 0::2] + values[1::2, 0::2] + values[0::2, 1::2] + values[1::2, 1::2]) // 4)
+            values = self._levels[level] = values.astype(np.uint8)
+            surface = pygame.surfarray.make_surface(values.T)
+        surface.set_palette(MAZE_PALETTE)
+        self._levels[("surface", level)] = surface
+        return surface
+
+    def _visible(self):
+        """
+        :return: the (first row, first column, end row, end column) of the cells in the view
+        """
+        rows, cols = self._shape
+        return (max(0, math.floor(self.view_y)), max(0, math.floor(self.view_x)),
+                min(rows, math.ceil(self.view_y + self.area.height / self.cell_height)),
+                min(cols, math.ceil(self.view_x + self.area.width / self.cell_width)))
+
+    def _compose(self, start, goal):
+        """
+        Renders the visible part of the maze, the painted overlay, the grid lines and the icons
+        over the background.
+        """
+        view = self._background.copy()
+        view.set_clip(self.area.inflate(2, 2))
+        rows, cols = self._shape
+        top, left, bottom, right = self._visible()
+        if self.cell_width >= 1:
+            level, step = 0, 1
+        else:
+            level = round(-math.log2(self.cell_width))
+            step = 1 << level
+            top, left = top - top % step, left - left % step
+
+        source = pygame.Rect(left // step, top // step, -(-(right - left) // step), -(-(bottom - top) // step))
+        bitmap = self._level(level)
+        source = source.clip(bitmap.get_rect())
+        position = (self._x(left), self._y(top))
+        size = (self._x(left + source.width * step) - position[0], self._y(top + source.height * step) - position[1])
+        if source.width and source.height:
+            view.blit(pygame.transform.scale(bitmap.subsurface(source), size), position)
+
+            # Overlays hold one byte per cell, 0 where they are transparent
+            for layer, palette in ((self._painted, list(self._palette)), (self._path_layer, [(0, 0, 0), PATH_COLOR])):
+                if layer is None:
+                    continue
+                overlay = pygame.image.frombuffer(layer, (cols, rows), "P")
+                overlay.set_palette(palette + [(0, 0, 0)] * (256 - len(palette)))
+                overlay.set_colorkey(0)
+                part = overlay.subsurface(pygame.Rect(left, top, right - left, bottom - top))
+                if step > 1:
+                    part = pygame.transform.scale(part, source.size)
+                view.blit(pygame.transform.scale(part, size), position)
+
+        if self.grid_lines:
+            for row in range(top, bottom + 1):
+                y = self._y(row)
+                pygame.draw.line(view, WHITE, (self._x(left), y), (self._x(right), y), 1)
+            for col in range(left, right + 1):
+                x = self._x(col)
+                pygame.draw.line(view, WHITE, (x, self._y(top)), (x, self._y(bottom)), 1)
+        else:
+            pygame.draw.rect(view, WHITE, (self._x(0) - 1, self._y(0) - 1, self._x(cols) - self._x(0) + 2,
+                                           self._y(rows) - self._y(0) + 2), 1)
+
+        for cell in (start, goal):
+            if top <= cell[0] < bottom and left <= cell[1] < right:
+                self._blit_icons(view, cell, start, goal)
+        view.set_clip(None)
+        return view
+
+    def draw_maze(self, screen, maze, start, goal, path=None, version=0):
+        """
+        Blits the visible part of the maze and highlights the given path on top of it.
+        Only the maze view is drawn; the rest of the screen is left as it is.
+
+        The maze bitmap is only rebuilt for a different maze object, start, goal or version, so
+        the caller bumps the version whenever it edits the maze in place.
+        :param screen: Pygame screen object to render the maze on
+        :param maze: Grid (or legacy 2D list) representing the maze grid
+        :param start: Tuple representing the coordinates of the starting point (row, column)
+        :param goal: Tuple representing the coordinates of the goal point (row, column)
+        :param path: List of tuples representing the cells of the path to be highlighted
+        :param version: a counter the caller increments after every edit of the maze
+        :return: the pygame.Rect of the screen that was drawn
+        """
+        # The maze is kept referenced, so its id is never reused by another object
+        maze_key = (id(maze), version, start, goal)
+        if maze is not self._maze or self._maze_key != maze_key:
+            if maze is not self._maze:
+                # The painted cells belong to a search of the previous maze, even one of the same size
+                self.clear_overlay()
+            self._set_maze(as_grid(maze, start, goal))
+            self._maze, self._maze_key = maze, maze_key
+
+        # The path is drawn into a layer of its own, so redraws with the same list do not walk it again
+        if path is not self._path:
+            rows, cols = self._shape
+            self._path_layer = bytearray(rows * cols) if path else None
+            for row, col in path or ():
+                self._path_layer[row * cols + col] = 1
+            self._path = path
+            self._path_version += 1
+
+        key = (maze_key, self._path_version, self._background_key, self.view_x, self.view_y, self.cell_width,
+               self.cell_height, self._painted_version)
+        if self._view_key != key:
+            self._view = self._compose(start, goal)
+            self._view_key = key
+
+        rect = self.area.inflate(2, 2)
+        screen.blit(self._view, rect, rect)
+        return rect
+
+    def draw_cells(self, screen, cells, color, start, goal, persist=False):
+        """
+        Fills the given cells that are in the view and returns the rectangles that changed.
+        :param screen: Pygame screen object to render the cells on
+        :param cells: iterable of (row, column) tuples
+        :param color: the fill color (RGB tuple)
+        :param start: Tuple representing the coordinates of the starting point (row, column)
+        :param goal: Tuple representing the coordinates of the goal point (row, column)
+        :param persist: whether to also record the cells in the overlay kept across redraws
+        :return: list of dirty pygame.Rect objects for pygame.display.update()
+        """
+        if self._shape is None:
+            return []
+        rows, cols = self._shape
+        if persist:
+            painted, value = self._overlay(color)
+
+        top, left, bottom, right = self._visible()
+        area = self.area
+        rects = []
+        screen.set_clip(area)
+        for cell in cells:
+            row, col = cell
+            if persist:
+                painted[row * cols + col] = value
+            if top <= row < bottom and left <= col < right:
+                rect = self.cell_rect(cell).clip(area)
+                screen.fill(color, rect)
+                self._blit_icons(screen, cell, start, goal)
+                rects.append(rect)
+        screen.set_clip(None)
+        return rects
+
+    def record_cells(self, cells, color):
+        """
+        Records cells in the overlay kept across redraws without drawing them; the next draw_maze()
+        shows them. Much faster than draw_cells() for a large batch that is redrawn anyway.
+        :param cells: iterable of (row, column) tuples
+        :param color: the fill color (RGB tuple)
+        """
+        if self._shape is None:
+            return
+        cols = self._shape[1]
+        painted, value = self._overlay(color)
+        for row, col in cells:
+            painted[row * cols + col] = value
+
+    def _overlay(self, color):
+        """
+        Prepares the overlay for new cells, which invalidates the composed view.
+        :return: a tuple of the overlay bytearray and the palette index of the color
+        """
+        if self._painted is None:
+            rows, cols = self._shape
+            self._painted = bytearray(rows * cols)
+            self._palette = {(0, 0, 0): 0}
+        if color not in self._palette and len(self._palette) < 256:
+            self._palette[color] = len(self._palette)
+        self._painted_version += 1
+        return self._painted, self._palette.get(color, 0)
+
+    def clear_overlay(self):
+        """
+        Forgets the cells painted by the previous search.
+        """
+        self._painted = None
+        self._painted_version += 1
+
+class PathAnimation:
+    """
+    Highlights a path incrementally, a few cells per frame, without ever blocking the event loop.
+
+    The main loop calls step() once per frame and passes the returned rectangles to
+    pygame.display.update(), so only the newly highlighted cells are redrawn.
+
+    Attributes:
+    - path: List of tuples representing the cells in the path.
+    - cells_per_frame: How many cells are highlighted per frame (may be fractional).
+    - position: How many cells of the path have been highlighted so far.
+    """
+
+    MIN_SPEED = 1 / 16
+    MAX_SPEED = 4096
+
+    def __init__(self, renderer, path, start, goal, cells_per_frame=1, color=PATH_COLOR):
+        """
+        Initializes an animation that has not highlighted any cell yet.
+
+        Parameters:
+        - renderer: the MazeRenderer the maze was drawn with.
+        - path: List of tuples representing the cells in the path.
+        - start: Tuple representing the coordinates of the starting point (row, column).
+        - goal: Tuple representing the coordinates of the goal point (row, column).
+        - cells_per_frame: How many cells are highlighted per frame (may be fractional).
+        - color: the highlight color (RGB tuple).
+        """
+        self.renderer = renderer
+        self.path = path
+        self.start = start
+        self.goal = goal
+        self.cells_per_frame = cells_per_frame
+        self.color = color
+        self.position = 0
+        self._budget = 0.0
+        self._shown = None
+
+    @property
+    def done(self):
+        return self.position >= len(self.path)
+
+    def shown(self):
+        """
+        :return: the cells highlighted so far, for redrawing the whole window mid-animation;
+                 the same list until more cells are highlighted
+        """
+        if self._shown is None or len(self._shown) != self.position:
+            self._shown = self.path[:self.position]
+        return self._shown
+
+    def step(self, screen):
+        """
+        Highlights the next cells_per_frame cells of the path.
+        :param screen: Pygame screen object to render the animation
+        :return: list of dirty pygame.Rect objects for pygame.display.update()
+        """
+        self._budget += self.cells_per_frame
+        count = int(self._budget)
+        self._budget -= count
+        return self._advance(screen, count)
+
+    def skip(self, screen):
+        """
+        Highlights every remaining cell at once.
+        :param screen: Pygame screen object to render the animation
+        :return: list of dirty pygame.Rect objects for pygame.display.update()
+        """
+        return self._advance(screen, len(self.path) - self.position)
+
+    def faster(self):
+        self.cells_per_frame = min(self.cells_per_frame * 2, self.MAX_SPEED)
+
+    def slower(self):
+        self.cells_per_frame = max(self.cells_per_frame / 2, self.MIN_SPEED)
+
+    def _advance(self, screen, count):
+        cells = self.path[self.position:self.position + count]
+        self.position += len(cells)
+        return self.renderer.draw_cells(screen, cells, self.color, self.start, self.goal)
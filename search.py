@@ -0,0 +1,597 @@
+import heapq
+import math
+from array import array
+from collections import deque
+from grid import as_grid
+#==============================================
+
+# Kinds of events yielded by the step-wise searches
+EXPANDED = "expanded"
+FRONTIER = "frontier"
+PATH_FOUND = "path-found"
+
+# g-score of cells the searches have not reached yet
+UNREACHED = 2 ** 31 - 1
+
+def _events(grid, expanded, frontier):
+    """
+    Builds one batch of events from the flat indices expanded and added to the frontier.
+    """
+    cell = grid.cell
+    return [(FRONTIER, [cell(index) for index in frontier]), (EXPANDED, [cell(index) for index in expanded])]
+
+def run_steps(steps):
+    """
+    Drains a step-wise search and returns its result.
+
+    :param steps: a generator returned by dfs_steps, bfs_steps or a_star_steps.
+    :return: A tuple containing the path from start to end and its cost.
+    """
+    for events in steps:
+        pass
+    return events[-1][1]
+
+def reconstruct_path(grid, parent, goal_index):
+    """
+    Follows parent pointers back from the goal to the start, whose parent is itself.
+
+    :param grid: The Grid the search ran on.
+    :param parent: Flat array holding the parent index of every reached cell.
+    :param goal_index: The flat index of the goal.
+    :return: A tuple containing the path from start to end and its cost (the sum of the weights
+             of the cells it enters, i.e. its number of moves on a maze without terrain weights).
+    """
+    path = [goal_index]
+    while parent[path[-1]] != path[-1]:
+        path.append(parent[path[-1]])
+    cells = grid.cells
+    return [grid.cell(index) for index in reversed(path)], sum(cells[index] for index in path[:-1])
+
+def path_cost(maze, path):
+    """
+    Adds up the cost of a path: the weights of the cells it enters, i.e. its number of moves
+    on a maze without terrain weights.
+
+    :param maze: The maze grid (a Grid or the legacy nested list).
+    :param path: List of (row, column) cells from the start to the goal.
+    :return: The cost of the path.
+    """
+    grid = as_grid(maze)
+    cells, index = grid.cells, grid.index
+    return sum(cells[index(cell)] for cell in path[1:])
+
+def dfs_steps(maze, start=None, goal=None, stats=None, batch=64):
+    """
+    Performs a depth-first search (DFS) step by step, yielding its progress in batches.
+
+    Every batch is a list of (kind, data) events: FRONTIER and EXPANDED carry the (row, column)
+    cells pushed and expanded since the previous batch, and the last batch ends with a
+    PATH_FOUND event whose data is the (path, cost) result, path being None if there is none.
+    Closing the generator stops the search.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :param batch: The number of expanded nodes per batch, 0 to only yield the result.
+    """
+    grid = as_grid(maze, start, goal)
+    start, goal = start or grid.start, goal or grid.goal
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    cells, offsets = grid.cells, grid.offsets
+    expanded, frontier = [], []
+
+    # parent[i] is -1 until cell i is pushed; the start is its own parent
+    parent = array("i", [-1]) * len(cells)
+    parent[start_index] = start_index
+    stack = deque([start_index])
+    count = 0
+
+    while stack:
+        current = stack.pop()
+        count += 1
+
+        if current == goal_index:
+            if stats is not None:
+                stats["expanded"] = count
+            yield _events(grid, expanded, frontier) + [(PATH_FOUND, reconstruct_path(grid, parent, goal_index))]
+            return
+
+        for offset in offsets:
+            node = current + offset
+            if cells[node] and parent[node] < 0:
+                parent[node] = current
+                stack.append(node)
+                if batch:
+                    frontier.append(node)
+
+        if batch:
+            expanded.append(current)
+            if len(expanded) >= batch:
+                yield _events(grid, expanded, frontier)
+                expanded, frontier = [], []
+
+    if stats is not None:
+        stats["expanded"] = count
+    yield _events(grid, expanded, frontier) + [(PATH_FOUND, (None, 0))]
+
+def DFS(maze, start=None, goal=None, stats=None):
+    """
+    Performs a depth-first search (DFS) algorithm to find a path from the start position to the end position in a maze.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :return: A tuple containing the path from start to end and its cost.
+    """
+    return run_steps(dfs_steps(maze, start, goal, stats, batch=0))
+
+def bfs_steps(maze, start=None, goal=None, stats=None, batch=64):
+    """
+    Performs a breadth-first search (BFS) step by step, yielding its progress in batches.
+    The events are the same as for dfs_steps.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :param batch: The number of expanded nodes per batch, 0 to only yield the result.
+    """
+    grid = as_grid(maze, start, goal)
+    start, goal = start or grid.start, goal or grid.goal
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    cells, offsets = grid.cells, grid.offsets
+    expanded, frontier = [], []
+
+    # parent[i] is -1 until cell i is queued; the start is its own parent
+    parent = array("i", [-1]) * len(cells)
+    parent[start_index] = start_index
+    queue = deque([start_index])
+    count = 0
+
+    while queue:
+        current = queue.popleft()
+        count += 1
+
+        if current == goal_index:
+            if stats is not None:
+                stats["expanded"] = count
+            yield _events(grid, expanded, frontier) + [(PATH_FOUND, reconstruct_path(grid, parent, goal_index))]
+            return
+
+        for offset in offsets:
+            node = current + offset
+            if cells[node] and parent[node] < 0:
+                parent[node] = current
+                queue.append(node)
+                if batch:
+                    frontier.append(node)
+
+        if batch:
+            expanded.append(current)
+            if len(expanded) >= batch:
+                yield _events(grid, expanded, frontier)
+                expanded, frontier = [], []
+
+    if stats is not None:
+        stats["expanded"] = count
+    yield _events(grid, expanded, frontier) + [(PATH_FOUND, (None, 0))]
+
+def BFS(maze, start=None, goal=None, stats=None):
+    """
+    Performs a breadth-first search (BFS) algorithm to find a path from the start position to the goal position in a maze.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :return: A tuple containing the shortest path from start to end and its cost.
+    """
+    return run_steps(bfs_steps(maze, start, goal, stats, batch=0))
+
+def manhattan(a, b):
+    """
+    Calculates the Manhattan distance between 'a' and 'b', admissible for 4-connected moves.
+
+    :param a: The current node position.
+    :param b: The goal node position.
+    :return: The heuristic cost from 'a' to 'b'.
+    """
+    return abs(b[0] - a[0]) + abs(b[1] - a[1])
+
+def octile(a, b):
+    """
+    Calculates the octile distance between 'a' and 'b', admissible for 8-connected moves.
+
+    :param a: The current node position.
+    :param b: The goal node position.
+    :return: The heuristic cost from 'a' to 'b'.
+    """
+    dx, dy = abs(b[0] - a[0]), abs(b[1] - a[1])
+    return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+def euclidean(a, b):
+    """
+    Calculates the heuristic (estimated) cost from node 'a' to node 'b' using the Euclidean distance formula.
+
+    :param a: The current node position.
+    :param b: The goal node position.
+    :return: The heuristic cost from 'a' to 'b'.
+    """
+    return math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
+
+HEURISTICS = {"manhattan": manhattan, "octile": octile, "euclidean": euclidean}
+
+def a_star_steps(maze, start=None, goal=None, heuristic="manhattan", stats=None, batch=64):
+    """
+    Performs the A* search step by step, yielding its progress in batches.
+    The events are the same as for dfs_steps.
+
+    The frontier is a binary heap ordered by (f, h, insertion order), so ties go to the node
+    closest to the goal and then to the oldest entry. Stale heap entries left behind by a
+    cheaper rediscovery are skipped when popped (lazy deletion). Entering a cell costs its
+    terrain weight, which is never below 1, so the heuristics stay admissible.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param heuristic: "manhattan", "octile", "euclidean" or a function of two (row, column) tuples.
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :param batch: The number of expanded nodes per batch, 0 to only yield the result.
+    """
+    grid = as_grid(maze, start, goal)
+    start, goal = start or grid.start, goal or grid.goal
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    cells, offsets, stride = grid.cells, grid.offsets, grid.stride
+    h = HEURISTICS[heuristic] if isinstance(heuristic, str) else heuristic
+    expanded, frontier = [], []
+
+    # Heuristics only look at coordinate differences, so padded coordinates work as well
+    padded_goal = divmod(goal_index, stride)
+    g_score = array("i", [UNREACHED]) * len(cells)
+    parent = array("i", [-1]) * len(cells)
+    closed = bytearray(len(cells))
+
+    h_start = h(start, goal)
+    queue = [(h_start, h_start, 0, start_index)]
+    g_score[start_index] = 0
+    parent[start_index] = start_index
+    counter = 1
+    count = 0
+
+    while queue:
+        _, _, _, current = heapq.heappop(queue)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        count += 1
+
+        if current == goal_index:
+            if stats is not None:
+                stats["expanded"] = count
+            yield _events(grid, expanded, frontier) + [(PATH_FOUND, reconstruct_path(grid, parent, goal_index))]
+            return
+
+        g_current = g_score[current]
+        for offset in offsets:
+            node = current + offset
+            weight = cells[node]
+            if weight and not closed[node] and g_current + weight < g_score[node]:
+                g_cost = g_score[node] = g_current + weight
+                parent[node] = current
+                h_cost = h(divmod(node, stride), padded_goal)
+                heapq.heappush(queue, (g_cost + h_cost, h_cost, counter, node))
+                counter += 1
+                if batch:
+                    frontier.append(node)
+
+        if batch:
+            expanded.append(current)
+            if len(expanded) >= batch:
+                yield _events(grid, expanded, frontier)
+                expanded, frontier = [], []
+
+    if stats is not None:
+        stats["expanded"] = count
+    yield _events(grid, expanded, frontier) + [(PATH_FOUND, (None, 0))]
+
+def a_star(maze, start=None, goal=None, heuristic="manhattan", stats=None):
+    """
+    Performs the A* search algorithm to find the shortest path from the start position to the end position in a maze.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param heuristic: "manhattan", "octile", "euclidean" or a function of two (row, column) tuples.
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :return: A tuple containing the path from start to end and its cost.
+    """
+    return run_steps(a_star_steps(maze, start, goal, heuristic, stats, batch=0))
+
+def dijkstra_steps(maze, start=None, goal=None, stats=None, batch=64):
+    """
+    Performs Dijkstra's search over the terrain weights step by step, yielding its progress in
+    batches. The events are the same as for dfs_steps.
+
+    Weights are small integers, so every queued distance lies within the largest weight C of
+    the distance being expanded. The frontier is therefore a bucket queue (Dial's algorithm): a
+    ring of C + 1 lists indexed by distance modulo C + 1, emptied in order of distance, which
+    costs O(n + C) in total instead of a binary heap's O(n log n). Stale entries left behind by
+    a cheaper rediscovery are skipped when their bucket is reached (lazy deletion).
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :param batch: The number of expanded nodes per batch, 0 to only yield the result.
+    """
+    grid = as_grid(maze, start, goal)
+    start, goal = start or grid.start, goal or grid.goal
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    cells, offsets = grid.cells, grid.offsets
+    expanded, frontier = [], []
+
+    distance = array("i", [UNREACHED]) * len(cells)
+    parent = array("i", [-1]) * len(cells)
+    ring = grid.max_weight() + 1
+    buckets = [[] for _ in range(ring)]
+    distance[start_index] = 0
+    parent[start_index] = start_index
+    buckets[0].append(start_index)
+    queued = 1
+    current_distance = 0
+    count = 0
+
+    while queued:
+        # Weights are at least 1, so nothing is added to this bucket while it is emptied
+        bucket = buckets[current_distance % ring]
+        while bucket:
+            current = bucket.pop()
+            queued -= 1
+            if distance[current] != current_distance:
+                continue
+            count += 1
+
+            if current == goal_index:
+                if stats is not None:
+                    stats["expanded"] = count
+                yield _events(grid, expanded, frontier) + [(PATH_FOUND, reconstruct_path(grid, parent, goal_index))]
+                return
+
+            for offset in offsets:
+                node = current + offset
+                weight = cells[node]
+                if weight and current_distance + weight < distance[node]:
+                    cost = distance[node] = current_distance + weight
+                    parent[node] = current
+                    buckets[cost % ring].append(node)
+                    queued += 1
+                    if batch:
+                        frontier.append(node)
+
+            if batch:
+                expanded.append(current)
+                if len(expanded) >= batch:
+                    yield _events(grid, expanded, frontier)
+                    expanded, frontier = [], []
+        current_distance += 1
+
+    if stats is not None:
+        stats["expanded"] = count
+    yield _events(grid, expanded, frontier) + [(PATH_FOUND, (None, 0))]
+
+def dijkstra(maze, start=None, goal=None, stats=None):
+    """
+    Performs Dijkstra's search with a bucket queue to find the cheapest path from the start position
+    to the goal position in a maze with terrain weights.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :return: A tuple containing the cheapest path from start to end and its cost.
+    """
+    return run_steps(dijkstra_steps(maze, start, goal, stats, batch=0))
+
+def _jump_straight(cells, node, step, sides, goal_index):
+    """
+    Scans from node along step until it reaches a jump point: the goal, or a cell with a
+    forced neighbor (an open side cell whose counterpart one cell back is blocked, so only
+    this cell leads to it).
+
+    :param step: The index offset of one move.
+    :param sides: The index offsets of the two cells beside the scan.
+    :return: the flat index of the jump point, -1 if the scan runs into a wall
+    """
+    while True:
+        node += step
+        if not cells[node]:
+            return -1
+        if node == goal_index:
+            return node
+        for side in sides:
+            if cells[node + side] and not cells[node - step + side]:
+                return node
+
+def _jump_branching(cells, node, step, corners, scans, goal_index):
+    """
+    Scans from node along step, running straight scans from every cell, until it reaches the
+    goal or a cell from which one of the straight scans finds a jump point.
+
+    :param step: The index offset of one move (vertical, or diagonal in 8-connected mode).
+    :param corners: The index offsets of cells that must be open to move along step (the two
+                    cells a diagonal move passes between, so it never cuts a corner).
+    :param scans: (step, sides) arguments of the straight scans run from every cell.
+    :return: the flat index of the jump point, -1 if the scan runs into a wall
+    """
+    while True:
+        for corner in corners:
+            if not cells[node + corner]:
+                return -1
+        node += step
+        if not cells[node]:
+            return -1
+        if node == goal_index:
+            return node
+        for direction, sides in scans:
+            if _jump_straight(cells, node, direction, sides, goal_index) >= 0:
+                return node
+
+def _walk_jumps(grid, parent, goal_index):
+    """
+    Follows parent pointers back from the goal through the jump points, filling in the cells
+    of every straight or diagonal segment between them.
+
+    :return: the path from start to goal as (row, column) tuples
+    """
+    points = [goal_index]
+    while parent[points[-1]] != points[-1]:
+        points.append(parent[points[-1]])
+    points.reverse()
+
+    stride = grid.stride
+    path = points[:1]
+    for target in points[1:]:
+        (row, col), (target_row, target_col) = divmod(path[-1], stride), divmod(target, stride)
+        step = ((target_row > row) - (target_row < row)) * stride + (target_col > col) - (target_col < col)
+        path.extend(range(path[-1] + step, target + step, step))
+    return [grid.cell(index) for index in path]
+
+def jps_steps(maze, start=None, goal=None, diagonal=False, stats=None, batch=64):
+    """
+    Performs a Jump Point Search step by step, yielding its progress in batches.
+    The events are the same as for dfs_steps, the cells being the jump points.
+
+    Jump Point Search is A* over a pruned set of nodes: rather than pushing every neighbor,
+    it scans along straight lines and only stops at jump points, cells where an optimal path
+    may have to turn. In 4-connected mode (the moves of a_star) paths are ordered vertical
+    moves first: a vertical scan runs horizontal scans from every cell, and a horizontal scan
+    only turns at forced neighbors. In 8-connected mode diagonal moves cost sqrt(2) and may
+    not cut corners, and diagonal scans play the part of the vertical ones.
+    The costs are the same as a_star's (or an 8-connected A*'s), with far fewer expanded
+    nodes on open grids. Jumps assume uniform costs, so terrain weights count as plain roads
+    when choosing the path, though the 4-connected cost reported is the path's weighted cost.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param diagonal: Whether to allow diagonal moves (8-connected).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :param batch: The number of expanded nodes per batch, 0 to only yield the result.
+    """
+    grid = as_grid(maze, start, goal)
+    start, goal = start or grid.start, goal or grid.goal
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    cells, stride = grid.cells, grid.stride
+    horizontal, vertical = (1, -1), (-stride, stride)
+    # Segments between jump points are straight or diagonal, so the heuristic is also their exact cost
+    h = octile if diagonal else manhattan
+    expanded, frontier = [], []
+
+    padded_goal = divmod(goal_index, stride)
+    g_score = array("d", [math.inf]) * len(cells)
+    parent = array("i", [-1]) * len(cells)
+    closed = bytearray(len(cells))
+
+    h_start = h(start, goal)
+    queue = [(h_start, h_start, 0, start_index)]
+    g_score[start_index] = 0
+    parent[start_index] = start_index
+    counter = 1
+    count = 0
+
+    while queue:
+        _, _, _, current = heapq.heappop(queue)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        count += 1
+
+        if current == goal_index:
+            if stats is not None:
+                stats["expanded"] = count
+            path = _walk_jumps(grid, parent, goal_index)
+            cost = g_score[goal_index] if diagonal else path_cost(grid, path)
+            yield _events(grid, expanded, frontier) + [(PATH_FOUND, (path, cost))]
+            return
+
+        # Pick the scans to run from the direction current was reached in
+        position = divmod(current, stride)
+        row, col = divmod(parent[current], stride)
+        row_step = (position[0] > row) - (position[0] < row)
+        col_step = (position[1] > col) - (position[1] < col)
+        straight, branching = [], []
+        if not diagonal:
+            if current == start_index:
+                straight += [(step, vertical) for step in horizontal]
+                branching += [(step, (), ((1, vertical), (-1, vertical))) for step in vertical]
+            elif row_step:
+                straight += [(1, vertical), (-1, vertical)]
+                branching.append((row_step * stride, (), ((1, vertical), (-1, vertical))))
+            else:
+                straight.append((col_step, vertical))
+                branching += [(side, (), ((1, vertical), (-1, vertical))) for side in vertical
+                              if cells[current + side] and not cells[current - col_step + side]]
+        elif current == start_index:
+            straight += [(step, vertical) for step in horizontal] + [(step, horizontal) for step in vertical]
+            branching += [(col + row, (col, row), ((col, vertical), (row, horizontal)))
+                          for col in horizontal for row in vertical]
+        else:
+            row_step *= stride
+            if col_step and row_step:
+                # Diagonal arrival: onwards along both components, and diagonally
+                straight += [(col_step, vertical), (row_step, horizontal)]
+                diagonals = [(col_step, row_step)]
+            else:
+                # Straight arrival: onwards, turning only towards forced neighbors, straight or diagonally
+                step, sides = (col_step, vertical) if col_step else (row_step, horizontal)
+                forced = [side for side in sides if cells[current + side] and not cells[current - step + side]]
+                straight.append((step, sides))
+                straight += [(side, horizontal if col_step else vertical) for side in forced]
+                diagonals = [(col_step or side, row_step or side) for side in forced]
+            branching += [(col + row, (col, row), ((col, vertical), (row, horizontal))) for col, row in diagonals]
+
+        jump_points = [_jump_straight(cells, current, step, sides, goal_index) for step, sides in straight]
+        jump_points += [_jump_branching(cells, current, step, corners, scans, goal_index)
+                        for step, corners, scans in branching]
+        for node in jump_points:
+            if node < 0 or closed[node]:
+                continue
+            point = divmod(node, stride)
+            g_cost = g_score[current] + h(position, point)
+            if g_cost < g_score[node]:
+                g_score[node] = g_cost
+                parent[node] = current
+                h_cost = h(point, padded_goal)
+                heapq.heappush(queue, (g_cost + h_cost, h_cost, counter, node))
+                counter += 1
+                if batch:
+                    frontier.append(node)
+
+        if batch:
+            expanded.append(current)
+            if len(expanded) >= batch:
+                yield _events(grid, expanded, frontier)
+                expanded, frontier = [], []
+
+    if stats is not None:
+        stats["expanded"] = count
+    yield _events(grid, expanded, frontier) + [(PATH_FOUND, (None, 0))]
+
+def jump_point_search(maze, start=None, goal=None, diagonal=False, stats=None):
+    """
+    Performs a Jump Point Search to find the shortest path from the start position to the goal position in a maze.
+
+    :param maze: The maze grid representing the environment (a Grid or the legacy nested list).
+    :param start: The starting position in the maze (defaults to the grid's start).
+    :param goal: The target position to reach in the maze (defaults to the grid's goal).
+    :param diagonal: Whether to allow diagonal moves (8-connected, costing sqrt(2) each).
+    :param stats: Optional dict that receives the number of nodes "expanded".
+    :return: A tuple containing the shortest path from start to end and its cost.
+    """
+    return run_steps(jps_steps(maze, start, goal, diagonal, stats, batch=0))
+
+# Step-wise engine behind each search function
+STEPS = {DFS: dfs_steps, BFS: bfs_steps, a_star: a_star_steps, dijkstra: dijkstra_steps,
+         jump_point_search: jps_steps}
@@ -0,0 +1,94 @@
+import hashlib
+from collections import OrderedDict
+from grid import as_grid
+#==============================================
+
+def maze_hash(maze):
+    """
+    Computes a content hash of a maze, covering its dimensions and walls.
+    :param maze: a Grid or the legacy nested-list maze
+    :return: the hex digest identifying the maze layout
+    """
+    grid = as_grid(maze)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"%d,%d;" % (grid.rows, grid.cols))
+    # Bit-packed grids (binmaze.PackedCells) hash their bitmap
+    digest.update(getattr(grid.cells, "buffer", grid.cells))
+    return digest.hexdigest()
+
+class SolveCache:
+    """
+    Least-recently-used cache of search results.
+
+    Results are keyed on the maze content hash, the algorithm, its keyword options and the
+    start and goal cells, so the same request is only ever solved once.
+
+    Attributes:
+    - maxsize: The maximum number of results kept before the oldest is evicted.
+    - hits: The number of requests answered from the cache.
+    - misses: The number of requests that had to run the algorithm.
+    """
+
+    def __init__(self, maxsize=32):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+        - maxsize: The maximum number of results kept before the oldest is evicted.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def solve(self, algorithm, maze, start, goal, **options):
+        """
+        Returns the result of algorithm(maze, start, goal, **options), running it only on a miss.
+        :param algorithm: the search function, e.g. DFS, BFS or a_star
+        :param maze: a Grid or the legacy nested-list maze
+        :param start: Tuple (row, column) of the starting point
+        :param goal: Tuple (row, column) of the goal point
+        :param options: extra keyword arguments forwarded to the algorithm
+        :return: the algorithm's (path, cost) tuple
+        """
+        result = self.lookup(algorithm, maze, start, goal, **options)
+        if result is None:
+            result = algorithm(maze, start, goal, **options)
+            self.store(result, algorithm, maze, start, goal, **options)
+        return result
+
+    def lookup(self, algorithm, maze, start, goal, **options):
+        """
+        Returns the cached result for the given request, counting a hit or a miss.
+        :return: the cached (path, cost) tuple, or None on a miss
+        """
+        key = self._key(algorithm, maze, start, goal, options)
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def store(self, result, algorithm, maze, start, goal, **options):
+        """
+        Caches a result computed elsewhere, e.g. by a step-wise search, evicting the oldest entry if full.
+        :param result: the (path, cost) tuple to cache
+        """
+        key = self._key(algorithm, maze, start, goal, options)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _key(self, algorithm, maze, start, goal, options):
+        return maze_hash(maze), algorithm.__name__, tuple(sorted(options.items())), start, goal
+
+    def clear(self):
+        """
+        Drops every cached result, keeping the hit/miss counters.
+        """
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,42 @@
+import os
+import binmaze
+from binmaze import VERSION, file_hash, load_cached, prune_cache
+from loaders import LOADER_VERSION
+#==============================================
+
+def write_maze(directory, name, text):
+    file_path = os.path.join(str(directory), name)
+    with open(file_path, "w") as file:
+        file.write(text)
+    return file_path
+
+def entry_name(file_path):
+    return "%s.v%d.l%d.maze" % (file_hash(file_path), VERSION, LOADER_VERSION)
+
+def test_cache_key_includes_loader_version(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    file_path = write_maze(tmp_path, "maze.txt", "S..#\n    \n#..G\n")
+    load_cached(file_path, directory=str(cache))
+    assert [name.endswith(".l%d.maze" % LOADER_VERSION) for name in os.listdir(str(cache))] == [True]
+
+    # A parse of other loader rules is never served, and is deleted by the next parse
+    monkeypatch.setattr("loaders.LOADER_VERSION", LOADER_VERSION + 1)
+    grid = load_cached(file_path, directory=str(cache))[0]
+    assert not grid.is_wall((1, 0))
+    assert [name.endswith(".l%d.maze" % (LOADER_VERSION + 1)) for name in os.listdir(str(cache))] == [True]
+
+def test_cache_is_pruned_to_limit_least_recently_used_first(tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    # Mazes of the same size, so their entries are the same size too
+    paths = [write_maze(tmp_path, "maze%d.txt" % number, text)
+             for number, text in enumerate(("S.G", ".SG", "SG.", "GS."))]
+    for age, file_path in zip((30, 20, 10), paths):
+        load_cached(file_path, directory=cache)
+        entry = os.path.join(cache, entry_name(file_path))
+        os.utime(entry, (os.path.getmtime(entry) - age,) * 2)
+    load_cached(paths[0], directory=cache)  # Reused, so now the most recently used
+
+    monkeypatch.setattr(binmaze, "CACHE_LIMIT", 3 * os.path.getsize(os.path.join(cache, entry_name(paths[0]))))
+    load_cached(paths[3], directory=cache)
+    assert sorted(os.listdir(cache)) == sorted(entry_name(paths[number]) for number in (0, 2, 3))
+    assert len(prune_cache(cache, limit=0)) == 3 and os.listdir(cache) == []
@@ -0,0 +1,35 @@
+import io
+import pytest
+from grid import ROAD, WALL
+from loaders import load_maze, parse_rows
+from search import BFS
+#==============================================
+
+def test_text_row_of_spaces_is_roads():
+    grid = parse_rows(io.StringIO("S..#\n    \n#..G"))
+    assert (grid.rows, grid.cols) == (3, 4)
+    assert all(grid.cells[grid.index((1, col))] == ROAD for col in range(4))
+    assert BFS(grid)[1] == 5
+
+def test_text_empty_line_inside_maze_is_blocks():
+    grid = parse_rows(io.StringIO("S..\n\n..G\n"))
+    assert (grid.rows, grid.cols) == (3, 3)
+    assert all(grid.cells[grid.index((1, col))] == WALL for col in range(3))
+    assert BFS(grid) == (None, 0)
+
+def test_blank_lines_around_maze_are_ignored():
+    grid = parse_rows(io.StringIO("\n\nS 0\n1 G\n\n"))
+    assert (grid.rows, grid.cols, grid.start, grid.goal) == (2, 2, (0, 0), (1, 1))
+
+def test_csv_weights_and_short_rows():
+    grid = parse_rows(io.StringIO("S,3,1\n0,G\n"), ",")
+    assert (grid.rows, grid.cols) == (2, 3)
+    assert grid.cells[grid.index((0, 1))] == 3
+    assert grid.is_wall((1, 2))
+
+@pytest.mark.parametrize("name, text", [("empty.csv", ""), ("empty.txt", "\n\n"), ("commas.csv", ",,\n,,\n")])
+def test_empty_maze_is_rejected(tmp_path, name, text):
+    file_path = tmp_path / name
+    file_path.write_text(text)
+    with pytest.raises(ValueError):
+        load_maze(str(file_path))
@@ -0,0 +1,78 @@
+import random
+import pytest
+import lpa_star
+from generator import generate
+from lpa_star import LPAStar
+from search import dijkstra, path_cost
+#==============================================
+
+class Abandon(Exception):
+    pass
+
+def assert_matches_dijkstra(planner):
+    path, cost = planner.plan()
+    assert cost == dijkstra(planner.grid, planner.start, planner.goal)[1]
+    if path is not None:
+        assert (path[0], path[-1]) == (planner.start, planner.goal)
+        assert cost == path_cost(planner.grid, path)
+
+@pytest.mark.parametrize("limit", [0, lpa_star.REPAIR_LIMIT, 1e9])
+def test_blocking_path_cells(monkeypatch, limit):
+    monkeypatch.setattr(lpa_star, "REPAIR_LIMIT", limit)
+    planner = LPAStar(generate("obstacles", 60, 3))
+    rng = random.Random(0)
+    for _ in range(15):
+        path = planner.plan()[0]
+        if path is None:
+            break
+        planner.set_wall(path[rng.randrange(1, len(path) - 1)])
+        assert_matches_dijkstra(planner)
+
+@pytest.mark.parametrize("kind", ["rooms", "terrain"])
+def test_random_toggles(kind):
+    planner = LPAStar(generate(kind, 40, 1))
+    rng = random.Random(1)
+    planner.plan()
+    for _ in range(60):
+        cell = (rng.randrange(planner.grid.rows), rng.randrange(planner.grid.cols))
+        if cell not in (planner.start, planner.goal):
+            planner.toggle(cell)
+            assert_matches_dijkstra(planner)
+
+def replan_after_blocking(grid, cell):
+    planner, first, stats = LPAStar(grid), {}, {}
+    planner.plan(first)
+    planner.set_wall(cell)
+    planner.plan(stats)
+    return first["expanded"], stats["expanded"]
+
+def test_repair_falls_back_to_a_new_search(monkeypatch):
+    grid = generate("obstacles", 200, 0)
+    cell = dijkstra(grid)[0][3]  # the distances of nearly every searched cell change
+    monkeypatch.setattr(lpa_star, "REPAIR_LIMIT", 1e9)
+    first, repair = replan_after_blocking(generate("obstacles", 200, 0), cell)
+    assert repair > first
+
+    monkeypatch.setattr(lpa_star, "REPAIR_LIMIT", 0.25)
+    edited = generate("obstacles", 200, 0)
+    first, replan = replan_after_blocking(edited, cell)
+    fresh = {}
+    LPAStar(edited).plan(fresh)
+    assert replan <= first * 0.25 + 1 + fresh["expanded"]
+
+@pytest.mark.parametrize("edits", [0, 1])
+def test_plan_resumes_after_checkpoint(monkeypatch, edits):
+    monkeypatch.setattr(lpa_star, "CHECKPOINT_INTERVAL", 16)
+    planner = LPAStar(generate("obstacles", 40, 2))
+    calls = []
+    def checkpoint():
+        calls.append(None)
+        if len(calls) == 3:
+            raise Abandon()
+    with pytest.raises(Abandon):
+        planner.plan(checkpoint=checkpoint)
+    rng = random.Random(2)
+    for _ in range(edits):
+        planner.toggle(rng.choice([(row, col) for row in range(40) for col in range(40)
+                                   if (row, col) not in (planner.start, planner.goal)]))
+    assert_matches_dijkstra(planner)
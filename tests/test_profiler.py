@@ -0,0 +1,25 @@
+import pstats
+import time
+from generator import generate
+from profiler import Profiler
+from search import BFS
+from worker import DONE, Worker
+#==============================================
+
+def test_worker_jobs_are_profiled(tmp_path):
+    profiler = Profiler()
+    profiler.enable(profile=True)
+    worker = Worker(profiler)
+    grid = generate("rooms", 50, 0)
+    worker.submit("search", lambda job: BFS(grid)[1])
+
+    messages = []
+    deadline = time.perf_counter() + 10
+    while not messages and time.perf_counter() < deadline:
+        messages = list(worker.poll())
+        time.sleep(0.01)
+    assert [kind for _, kind, _ in messages] == [DONE]
+
+    profiler.write(str(tmp_path / "run"))
+    functions = {name for _, _, name in pstats.Stats(str(tmp_path / "run.prof")).stats}
+    assert "bfs_steps" in functions
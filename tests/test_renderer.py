@@ -0,0 +1,34 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+import pytest
+from generator import generate
+from renderer import EXPANDED_COLOR, MazeRenderer
+#==============================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def renderer(monkeypatch):
+    # The start and goal icons are loaded from img/, relative to the repository
+    monkeypatch.chdir(ROOT)
+    return MazeRenderer(800, 700)
+
+def color_at(screen, renderer, cell):
+    return tuple(screen.get_at(renderer.cell_rect(cell).center))[:3]
+
+def test_overlay_is_cleared_for_a_new_maze_of_the_same_size(renderer):
+    screen = pygame.Surface((800, 700))
+    renderer.make_gradient_background(screen, (0, 0, 0), (0, 0, 0))
+    old, new = generate("obstacles", 20, 0), generate("obstacles", 20, 1)
+    cell = next((row, col) for row in range(20) for col in range(20)
+                if not old.is_wall((row, col)) and not new.is_wall((row, col)) and (row, col) not in
+                (old.start, old.goal, new.start, new.goal))
+
+    renderer.draw_maze(screen, old, old.start, old.goal)
+    renderer.draw_cells(screen, [cell], EXPANDED_COLOR, old.start, old.goal, persist=True)
+    renderer.draw_maze(screen, old, old.start, old.goal)
+    assert color_at(screen, renderer, cell) == EXPANDED_COLOR
+
+    renderer.draw_maze(screen, new, new.start, new.goal)
+    assert color_at(screen, renderer, cell) != EXPANDED_COLOR
@@ -0,0 +1,51 @@
+import threading
+import time
+from worker import DONE, PROGRESS, Cancelled, Worker
+#==============================================
+
+def wait_for(worker, count):
+    messages = []
+    deadline = time.perf_counter() + 10
+    while len(messages) < count and time.perf_counter() < deadline:
+        messages += worker.poll()
+        time.sleep(0.01)
+    return messages
+
+def test_reports_are_joined_while_the_queue_is_full():
+    worker = Worker(max_messages=4)
+    reported = threading.Event()
+    def job_function(job):
+        for batch in range(100):
+            job.report([batch])
+        reported.set()
+        return "result"
+    worker.submit("search", job_function)
+    # Nothing is polled, yet the job reports everything without waiting
+    assert reported.wait(10)
+
+    messages = wait_for(worker, 6)
+    kinds = [kind for _, kind, _ in messages]
+    assert kinds == [PROGRESS] * 5 + [DONE]
+    assert [batch for _, kind, data in messages if kind == PROGRESS for batch in data] == list(range(100))
+    assert messages[-1][2] == "result"
+
+def test_cancelled_job_posts_nothing_more():
+    worker = Worker(max_messages=1)
+    started, cancelled = threading.Event(), threading.Event()
+    outcome = []
+    def job_function(job):
+        job.report([0])
+        started.set()
+        cancelled.wait(10)
+        try:
+            job.report([1])
+        except Cancelled:
+            outcome.append("cancelled")
+            raise
+    job = worker.submit("search", job_function)
+    assert started.wait(10)
+    job.cancel()
+    cancelled.set()
+    time.sleep(0.2)
+    assert outcome == ["cancelled"]
+    assert list(worker.poll()) == []
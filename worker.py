@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+#==============================================
+
+# Kinds of messages posted by jobs
+PROGRESS = "progress"
+DONE = "done"
+FAILED = "failed"
+
+class Cancelled(Exception):
+    """
+    Raised at a checkpoint of a job that was cancelled.
+    """
+
+class Job:
+    """
+    A function run by a Worker, which reports progress as it goes and can be cancelled.
+
+    Cancellation is cooperative: the function calls checkpoint() (or report(), which is also a
+    checkpoint) regularly, and these raise Cancelled once cancel() was called. Messages of a
+    cancelled job are never delivered.
+
+    Attributes:
+    - kind: A label chosen by the caller, e.g. "load" or "search".
+    - started: The time.perf_counter() value when the job was submitted.
+    """
+
+    def __init__(self, worker, kind):
+        """
+        Initializes a job; use Worker.submit() rather than creating jobs directly.
+
+        Parameters:
+        - worker: The Worker running the job.
+        - kind: A label chosen by the caller, e.g. "load" or "search".
+        """
+        self.kind = kind
+        self.started = time.perf_counter()
+        self._worker = worker
+        self._cancelled = threading.Event()
+        self._pending = []
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Asks the job to stop at its next checkpoint.
+        """
+        self._cancelled.set()
+
+    def checkpoint(self):
+        """
+        Raises Cancelled if the job was cancelled.
+        """
+        if self._cancelled.is_set():
+            raise Cancelled
+
+    def report(self, data):
+        """
+        Posts a progress message without waiting for the consumer: while the result queue is full,
+        the reports are joined into one list, posted as soon as there is room (at the latest before
+        the result). It is also a checkpoint.
+        :param data: the progress data, a list, e.g. a batch of search events
+        """
+        self.checkpoint()
+        self._pending.extend(data)
+        try:
+            self._worker.results.put_nowait((self, PROGRESS, self._pending))
+        except queue.Full:
+            return
+        self._pending = []
+
+class Worker:
+    """
+    Runs jobs one at a time on a background thread and hands their messages to the thread
+    that polls it, e.g. the GUI main loop once per frame, so that the latter never stalls.
+
+    Messages are (job, kind, data) tuples: PROGRESS with the data passed to Job.report() (that of
+    several calls joined while the consumer lags behind), then DONE with the result of the
+    function, or FAILED with the exception it raised.
+
+    Attributes:
+    - results: The bounded queue.Queue of messages.
+    """
+
+    def __init__(self, profiler=None, max_messages=64):
+        """
+        Initializes a worker; its thread starts with the first job.
+
+        Parameters:
+        - profiler: Optional profiler.Profiler; while it runs cProfile, jobs are profiled too.
+        - max_messages: The number of messages queued before progress reports are joined and results
+          wait for them to be polled.
+        """
+        self.results = queue.Queue(max_messages)
+        self._profiler = profiler
+        self._jobs = queue.Queue()
+        self._thread = None
+
+    def submit(self, kind, function, *args):
+        """
+        Queues function(job, *args) to run on the worker thread, after the jobs before it.
+        :param kind: a label for the job, e.g. "load" or "search"
+        :param function: the function to run; it receives the Job first
+        :return: the Job
+        """
+        job = Job(self, kind)
+        self._jobs.put((job, function, args))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="maze-worker", daemon=True)
+            self._thread.start()
+        return job
+
+    def _run(self):
+        while True:
+            job, function, args = self._jobs.get()
+            if job.cancelled:
+                continue
+            try:
+                if self._profiler is None:
+                    result = function(job, *args)
+                else:
+                    with self._profiler.profiling():
+                        result = function(job, *args)
+            except Cancelled:
+                continue
+            except Exception as error:
+                self._post(job, FAILED, error)
+                continue
+            self._post(job, DONE, result)
+
+    def _post(self, job, kind, data):
+        """
+        Posts the reports the job still holds, then the message, waiting while the queue is full.
+        Nothing more is posted once the job is cancelled.
+        """
+        for message in ([(job, PROGRESS, job._pending)] if job._pending else []) + [(job, kind, data)]:
+            while not job.cancelled:
+                try:
+                    self.results.put(message, timeout=0.05)
+                    break
+                except queue.Full:
+                    pass
+        job._pending = []
+
+    def poll(self):
+        """
+        Takes the messages that are ready, without waiting, skipping those of cancelled jobs.
+        The caller may stop iterating at any time; the remaining messages stay queued.
+        :return: generator of (job, kind, data) tuples
+        """
+        while True:
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if not message[0].cancelled:
+                yield message